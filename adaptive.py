@@ -0,0 +1,229 @@
+"""Selección adaptativa de ítems con ratings tipo Elo.
+
+Cada ítem y cada alumno (por parte) tienen un rating. Tras cada envío se
+actualizan los dos con la regla de Elo, usando como resultado la fracción de
+huecos acertados. Para elegir el siguiente ítem se busca uno cuyo rating deje
+al alumno con ~70% de probabilidad de acierto.
+
+Los ítems de cada banco se guardan en un índice por cubetas de rating (50
+puntos): elegir es mirar las cubetas más cercanas al objetivo y sacar uno al
+azar, y mover un ítem tras actualizar su rating es O(1). Nunca se recorre el
+banco entero en un rerun; el índice se construye una vez por versión del banco.
+
+Los ratings se guardan en SQLite (FCE_STATS_DB) desde un hilo en segundo plano,
+como incrementos: varias réplicas pueden compartir la misma base de datos.
+"""
+import atexit
+import math
+import os
+import queue
+import random
+import sqlite3
+import threading
+
+from shared_volume import shared_path
+
+DEFAULT_RATING = 1500.0
+BUCKET_WIDTH = 50
+K_LEARNER = 32
+K_ITEM = 16
+TARGET_SUCCESS = 0.7
+# Diferencia de rating que da TARGET_SUCCESS de probabilidad de acierto
+TARGET_OFFSET = 400 * math.log10(TARGET_SUCCESS / (1 - TARGET_SUCCESS))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS item_ratings (
+    part TEXT NOT NULL, item_id TEXT NOT NULL, rating REAL NOT NULL, n INTEGER NOT NULL,
+    PRIMARY KEY (part, item_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS learner_ratings (
+    part TEXT NOT NULL, learner TEXT NOT NULL, rating REAL NOT NULL, n INTEGER NOT NULL,
+    PRIMARY KEY (part, learner)
+) WITHOUT ROWID;
+"""
+
+
+def expected(learner_rating, item_rating):
+    """Probabilidad de acierto según Elo."""
+    return 1 / (1 + 10 ** ((item_rating - learner_rating) / 400))
+
+
+class BucketIndex:
+    """Ids agrupados en cubetas por rating, con borrado O(1) (intercambio con el último)."""
+
+    def __init__(self):
+        self.buckets = {}   # cubeta -> lista de ids
+        self._where = {}    # id -> (cubeta, posición)
+
+    def __len__(self):
+        return len(self._where)
+
+    def add(self, item_id, rating):
+        b = int(rating // BUCKET_WIDTH)
+        ids = self.buckets.setdefault(b, [])
+        self._where[item_id] = (b, len(ids))
+        ids.append(item_id)
+
+    def remove(self, item_id):
+        b, pos = self._where.pop(item_id)
+        ids = self.buckets[b]
+        last = ids.pop()
+        if last != item_id:
+            ids[pos] = last
+            self._where[last] = (b, pos)
+        if not ids:
+            del self.buckets[b]
+
+    def move(self, item_id, rating):
+        if int(rating // BUCKET_WIDTH) != self._where[item_id][0]:
+            self.remove(item_id)
+            self.add(item_id, rating)
+
+    def near(self, rating, exclude=(), rng=random):
+        """Un id al azar de la cubeta más cercana a `rating` que tenga alguno no excluido."""
+        center = int(rating // BUCKET_WIDTH)
+        keys = sorted(self.buckets, key=lambda b: abs(b - center))  # nº de cubetas, no de ítems
+        for b in keys:
+            ids = self.buckets[b]
+            # Unos pocos intentos al azar y, si la cubeta es pequeña, recorrido completo
+            for _ in range(min(8, len(ids))):
+                candidate = ids[rng.randrange(len(ids))]
+                if candidate not in exclude:
+                    return candidate
+            if len(ids) <= 64:
+                free = [i for i in ids if i not in exclude]
+                if free:
+                    return rng.choice(free)
+        return None
+
+
+class RatingEngine:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._item = {}      # (part, id) -> [rating, n]
+        self._learner = {}   # (part, learner) -> [rating, n]
+        self._indexes = {}   # part -> (versión del banco, BucketIndex)
+        self._queue = queue.Queue()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        self._item = {(p, i): [r, n] for p, i, r, n in conn.execute("SELECT part, item_id, rating, n FROM item_ratings")}
+        conn.close()
+        threading.Thread(target=self._write_loop, name="fce-ratings", daemon=True).start()
+        atexit.register(self.flush)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # --- Ratings ---
+    def item_rating(self, part, item_id):
+        return self._item.get((part, item_id), (DEFAULT_RATING, 0))[0]
+
+    def learner_rating(self, part, learner):
+        key = (part, learner)
+        if key not in self._learner:
+            conn = self._connect()
+            row = conn.execute("SELECT rating, n FROM learner_ratings WHERE part = ? AND learner = ?", key).fetchone()
+            conn.close()
+            with self._lock:
+                self._learner.setdefault(key, list(row) if row else [DEFAULT_RATING, 0])
+        return self._learner[key][0]
+
+    def update(self, part, learner, item_id, score):
+        """Aplica un envío (score = fracción acertada, 0..1) al alumno y al ítem."""
+        r_l = self.learner_rating(part, learner)
+        with self._lock:
+            item = self._item.setdefault((part, item_id), [DEFAULT_RATING, 0])
+            delta = score - expected(r_l, item[0])
+            lrn = self._learner[(part, learner)]
+            lrn[0] += K_LEARNER * delta
+            lrn[1] += 1
+            item[0] -= K_ITEM * delta
+            item[1] += 1
+            index = self._indexes.get(part)
+            if index and item_id in index[1]._where:
+                index[1].move(item_id, item[0])
+            # Se guardan los cambios, no los valores: las réplicas comparten fce_stats.db
+            self._queue.put((part, learner, K_LEARNER * delta, item_id, -K_ITEM * delta))
+        return lrn[0]
+
+    # --- Selección ---
+    def _index(self, bank):
+        cached = self._indexes.get(bank.part)
+        if cached and cached[0] == bank.version:
+            return cached[1]
+        with self._lock:
+            cached = self._indexes.get(bank.part)
+            if cached and cached[0] == bank.version:
+                return cached[1]
+            index = BucketIndex()
+            for item in bank.items:
+                index.add(item.id, self.item_rating(bank.part, item.id))
+            self._indexes[bank.part] = (bank.version, index)
+            return index
+
+    def select(self, bank, learner, n=1, recent=()):
+        """n ítems distintos cerca del nivel del alumno, evitando los de `recent`."""
+        index = self._index(bank)
+        target = self.learner_rating(bank.part, learner) - TARGET_OFFSET
+        exclude = set(recent)
+        chosen = []
+        for _ in range(n):
+            item_id = index.near(target, exclude)
+            if item_id is None:  # Ya vio todo: se permite repetir
+                exclude = set(chosen)
+                item_id = index.near(target, exclude)
+                if item_id is None:
+                    break
+            exclude.add(item_id)
+            chosen.append(bank.get(item_id))
+        return chosen
+
+    # --- Persistencia ---
+    def flush(self):
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch, waiters = [], []
+            item = self._queue.get()
+            while True:
+                (waiters if isinstance(item, threading.Event) else batch).append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    # Sumas en SQLite: lo que otra réplica escribió a la vez no se pisa
+                    conn.executemany("""
+                        INSERT INTO learner_ratings (part, learner, rating, n) VALUES (?1, ?2, ?3 + ?4, 1)
+                        ON CONFLICT (part, learner) DO UPDATE SET rating = rating + ?4, n = n + 1
+                    """, [(p, lrn, DEFAULT_RATING, d) for p, lrn, d, _, _ in batch])
+                    conn.executemany("""
+                        INSERT INTO item_ratings (part, item_id, rating, n) VALUES (?1, ?2, ?3 + ?4, 1)
+                        ON CONFLICT (part, item_id) DO UPDATE SET rating = rating + ?4, n = n + 1
+                    """, [(p, i, DEFAULT_RATING, d) for p, _, _, i, d in batch])
+            except sqlite3.Error as e:
+                print(f"Error guardando ratings: {e}")
+            for w in waiters:
+                w.set()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RatingEngine(os.environ.get("FCE_STATS_DB") or shared_path("fce_stats.db"))
+    return _engine
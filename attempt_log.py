@@ -0,0 +1,201 @@
+"""Registro de intentos (append-only) y estadísticas de dificultad por ítem y hueco.
+
+Cada respuesta corregida se encola y un hilo en segundo plano, cada segundo:
+
+    1. añade el lote al log en formato columnar (una línea JSON por lote, con
+       una lista por columna) -> FCE_ATTEMPT_LOG, por defecto fce_attempts.jsonl
+    2. suma el lote a los agregados en SQLite (FCE_STATS_DB, por defecto
+       fce_stats.db): aciertos, tiempo frente al límite y respuestas erróneas
+
+La vista de analíticas solo consulta los agregados, nunca el log completo.
+"""
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from shared_volume import file_lock, shared_path
+
+COLUMNS = ("ts", "learner", "part", "item", "gap", "answer", "correct", "elapsed", "limit")
+FLUSH_INTERVAL = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS item_stats (
+    part TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    submissions INTEGER NOT NULL DEFAULT 0,
+    gaps INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    time_sum REAL NOT NULL DEFAULT 0,
+    time_ratio_sum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (part, item_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS gap_stats (
+    part TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    gap INTEGER NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (part, item_id, gap)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS wrong_answers (
+    part TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    gap INTEGER NOT NULL,
+    answer TEXT NOT NULL,
+    n INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (part, item_id, gap, answer)
+) WITHOUT ROWID;
+"""
+
+
+class AttemptLog:
+    def __init__(self, log_path, db_path, flush_interval=FLUSH_INTERVAL):
+        self.log_path = log_path
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+        self._writer = threading.Thread(target=self._flush_loop, name="fce-attempt-log", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # --- Escritura (desde el hilo del script: solo encola) ---
+    def record(self, learner, part, item_id, answers, correct, elapsed, limit, given=None):
+        """Registra un envío: una fila por hueco. `answers` y `correct` van en paralelo.
+
+        `answers` es lo que escribió el alumno (va al log); `given`, su forma normalizada,
+        es la que se agrupa en las respuestas erróneas frecuentes (por defecto, `answers`).
+        """
+        ts = time.time()
+        given = answers if given is None else given
+        # Tras las columnas del log va la respuesta normalizada, que solo usan los agregados
+        self._queue.put([(ts, learner, part, item_id, gap, answer, bool(ok), elapsed, limit, norm)
+                         for gap, (answer, ok, norm) in enumerate(zip(answers, correct, given))])
+
+    def flush(self):
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def _flush_loop(self):
+        conn = self._connect()
+        while True:
+            batch, waiters = [], []
+            item = self._queue.get()
+            time.sleep(self.flush_interval)
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._append_log(batch)
+                    self._update_stats(conn, batch)
+                except (OSError, sqlite3.Error) as e:
+                    print(f"Error guardando intentos: {e}")
+            for w in waiters:
+                w.set()
+
+    def _append_log(self, submissions):
+        rows = [row for sub in submissions for row in sub]
+        columns = {name: [row[i] for row in rows] for i, name in enumerate(COLUMNS)}
+        line = (json.dumps(columns, ensure_ascii=False) + "\n").encode("utf-8")
+        # Con varias réplicas escribiendo en el mismo log, las líneas no se pueden mezclar
+        with file_lock(self.log_path) as f:
+            f.write(line)
+
+    def _update_stats(self, conn, submissions):
+        items, gaps, wrong = [], [], []
+        for sub in submissions:
+            _, _, part, item_id, _, _, _, elapsed, limit, _ = sub[0]
+            n_correct = sum(1 for row in sub if row[6])
+            ratio = elapsed / limit if limit else 0.0
+            items.append((part, item_id, len(sub), n_correct, elapsed, ratio))
+            for _, _, _, _, gap, _, ok, _, _, given in sub:
+                gaps.append((part, item_id, gap, int(ok)))
+                if not ok:
+                    wrong.append((part, item_id, gap, given or ""))
+        with conn:
+            conn.executemany("""
+                INSERT INTO item_stats (part, item_id, submissions, gaps, correct, time_sum, time_ratio_sum)
+                VALUES (?1, ?2, 1, ?3, ?4, ?5, ?6)
+                ON CONFLICT (part, item_id) DO UPDATE SET
+                    submissions = submissions + 1, gaps = gaps + ?3, correct = correct + ?4,
+                    time_sum = time_sum + ?5, time_ratio_sum = time_ratio_sum + ?6
+            """, items)
+            conn.executemany("""
+                INSERT INTO gap_stats (part, item_id, gap, attempts, correct) VALUES (?1, ?2, ?3, 1, ?4)
+                ON CONFLICT (part, item_id, gap) DO UPDATE SET attempts = attempts + 1, correct = correct + ?4
+            """, gaps)
+            conn.executemany("""
+                INSERT INTO wrong_answers (part, item_id, gap, answer, n) VALUES (?, ?, ?, ?, 1)
+                ON CONFLICT (part, item_id, gap, answer) DO UPDATE SET n = n + 1
+            """, wrong)
+
+    # --- Lectura de agregados ---
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def item_stats(self, part, limit=50):
+        """Ítems de la parte ordenados de más difícil a más fácil."""
+        rows = self._reader().execute("""
+            SELECT item_id, submissions, CAST(correct AS REAL) / gaps, time_sum / submissions,
+                   time_ratio_sum / submissions
+            FROM item_stats WHERE part = ? AND gaps > 0
+            ORDER BY CAST(correct AS REAL) / gaps, submissions DESC LIMIT ?
+        """, (part, limit)).fetchall()
+        return [{"item_id": r[0], "submissions": r[1], "accuracy": r[2], "mean_time_s": r[3],
+                 "mean_time_vs_limit": r[4]} for r in rows]
+
+    def gap_stats(self, part, item_id, top_wrong=3):
+        """Aciertos por hueco y sus respuestas erróneas más frecuentes."""
+        conn = self._reader()
+        rows = conn.execute("""
+            SELECT gap, attempts, CAST(correct AS REAL) / attempts FROM gap_stats
+            WHERE part = ? AND item_id = ? ORDER BY gap
+        """, (part, item_id)).fetchall()
+        out = []
+        for gap, attempts, accuracy in rows:
+            wrong = conn.execute("""
+                SELECT answer, n FROM wrong_answers WHERE part = ? AND item_id = ? AND gap = ?
+                ORDER BY n DESC LIMIT ?
+            """, (part, item_id, gap, top_wrong)).fetchall()
+            out.append({"gap": gap + 1, "attempts": attempts, "accuracy": accuracy,
+                        "common_wrong": ", ".join(f"{a or '(blank)'} ×{n}" for a, n in wrong)})
+        return out
+
+
+_log = None
+_log_lock = threading.Lock()
+
+
+def get_log():
+    """Registro compartido por todo el proceso."""
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = AttemptLog(os.environ.get("FCE_ATTEMPT_LOG") or shared_path("fce_attempts.jsonl"),
+                                  os.environ.get("FCE_STATS_DB") or shared_path("fce_stats.db"))
+    return _log
@@ -0,0 +1,193 @@
+"""Compilador y validador offline de los bancos de ítems.
+
+Lee los tres formatos CSV en streaming (fila a fila, sin cargar el archivo
+entero), valida cada fila y avisa con el número de línea exacto de todo lo que
+la app descartaría en silencio o que fallaría delante de un alumno:
+
+    * filas con campos de menos/de más o campos obligatorios vacíos
+    * cabeceras repetidas dentro del archivo o con BOM
+    * huecos `_n_` que no cuadran con el número de respuestas
+    * grupos de `Options` sin exactamente 4 opciones, o cuya respuesta no está entre ellas
+    * frases de Part 3 sin un único `______`
+    * respuestas alternativas vacías (`which//that`, `that/`)
+
+Las filas válidas se escriben en un banco binario indexado (`.fceb`) junto al
+CSV (o en FCE_SHARED_DIR en modo réplicas), que la app carga con mmap al arrancar.
+
+Uso:
+    python bank_compiler.py [--data-dir DIR] [--out-dir DIR] [--parts p1,p2,p3] [--check-only] [--strict]
+"""
+import argparse
+import csv
+import os
+import sys
+
+from item_bank import (ALT_SEP, BANK_SPECS, BankWriter, Item, alternatives, check_row, compile_row, compiled_path,
+                       data_dir)
+from render import compile_template
+
+P3_GAP = "______"
+
+
+class Issue:
+    __slots__ = ("path", "line", "level", "message")
+
+    def __init__(self, path, line, level, message):
+        self.path = path
+        self.line = line
+        self.level = level
+        self.message = message
+
+    def __str__(self):
+        return f"{self.path}:{self.line}: {self.level}: {self.message}"
+
+
+# ==============================================================================
+# 1. LECTURA EN STREAMING
+# ==============================================================================
+def iter_rows(path):
+    """Genera (línea_inicial, cabecera, fila) leyendo el CSV registro a registro.
+
+    La línea es la del inicio del registro (un texto entre comillas puede ocupar varias).
+    """
+    with open(path, "rb") as f:
+        has_bom = f.read(3) == b"\xef\xbb\xbf"
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f, quotechar='"')
+        header = next(reader, None)
+        yield (1, header, has_bom)
+        last_line = reader.line_num
+        for row in reader:
+            yield (last_line + 1, header, row)
+            last_line = reader.line_num
+
+
+# ==============================================================================
+# 2. VALIDACIÓN
+# ==============================================================================
+def validate_row(part, header, row):
+    """Devuelve (errores, avisos, dict_fila). Con errores la fila se descarta."""
+    errors, warnings = [], []
+    # Mismo filtro que la app al cargar el CSV: lo que aquí es error, allí se descarta
+    record, problem = check_row(header, row, BANK_SPECS[part][1])
+    if record is None:
+        return [problem], warnings, None
+    if problem:
+        warnings.append(problem)
+
+    if part == "p3":
+        n = record["Sentence"].count(P3_GAP)
+        if n != 1:
+            errors.append(f"sentence must contain exactly one '{P3_GAP}' (found {n})")
+        if "" in (a.strip() for a in record["Answer"].split(ALT_SEP)):
+            warnings.append(f"empty alternative in answer '{record['Answer'].strip()}'")
+        return errors, warnings, record
+
+    answers = [a.strip() for a in record["Answers"].split("|")]
+    if any(not a for a in answers):
+        errors.append("empty answer in 'Answers'")
+    problems = compile_template(record["Text"].strip(), len(answers)).problems
+    errors.extend(f"gap markers: {p}" for p in problems)
+
+    if part == "p1":
+        groups = [[o.strip() for o in g.split("/")] for g in record["Options"].split("|")]
+        if len(groups) != len(answers):
+            errors.append(f"{len(groups)} option groups for {len(answers)} answers")
+        for i, (group, answer) in enumerate(zip(groups, answers), start=1):
+            if len(group) != 4:
+                errors.append(f"gap {i}: expected 4 options, found {len(group)}")
+            if answer not in group:
+                errors.append(f"gap {i}: answer '{answer}' is not one of the options")
+    if part == "p2":
+        for i, answer in enumerate(answers, start=1):
+            if "" in (a.strip() for a in answer.split(ALT_SEP)):
+                warnings.append(f"gap {i}: empty alternative in '{answer}'")
+            if any(" " in a for a in alternatives(answer)):
+                warnings.append(f"gap {i}: answer '{answer}' is more than one word")
+    return errors, warnings, record
+
+
+# ==============================================================================
+# 3. COMPILACIÓN
+# ==============================================================================
+def compile_bank(part, csv_path, out_path=None, check_only=False, report=print):
+    """Valida `csv_path` y, salvo check_only, escribe el .fceb. Devuelve (válidas, errores, avisos)."""
+    seen = {}
+    n_ok = n_err = n_warn = 0
+    rows = iter_rows(csv_path)
+    _, header, has_bom = next(rows)
+    if header is None:
+        report(Issue(csv_path, 1, "error", "file is empty"))
+        return 0, 1, 0
+    if has_bom:
+        report(Issue(csv_path, 1, "warning", "header starts with a UTF-8 BOM"))
+        n_warn += 1
+    missing = [c for c in BANK_SPECS[part][1] if c not in header]
+    if missing:
+        report(Issue(csv_path, 1, "error", f"missing column(s): {', '.join(missing)}"))
+        return 0, 1, n_warn
+
+    writer = None if check_only else BankWriter(out_path or compiled_path(csv_path), part)
+    try:
+        for line, _, row in rows:
+            errors, warnings, record = validate_row(part, header, row)
+            for w in warnings:
+                report(Issue(csv_path, line, "warning", w))
+            n_warn += len(warnings)
+            if errors:
+                for e in errors:
+                    report(Issue(csv_path, line, "error", e))
+                n_err += len(errors)
+                continue
+
+            # Mismos ids que item_bank.compile_rows: las repeticiones llevan sufijo
+            item = compile_row(part, record)
+            if item.id in seen:
+                first_line, n = seen[item.id]
+                report(Issue(csv_path, line, "warning", f"duplicate of line {first_line}"))
+                n_warn += 1
+                seen[item.id] = (first_line, n + 1)
+                item = Item(**{**item.to_dict(), "id": f"{item.id}-{n}"})
+            else:
+                seen[item.id] = (line, 1)
+            if writer:
+                writer.add(item)
+            n_ok += 1
+    except BaseException:
+        if writer:
+            writer.abort()
+        raise
+    if writer:
+        writer.close()
+    return n_ok, n_err, n_warn
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default=None, help="folder with the CSV files (default: FCE_DATA_DIR or .)")
+    parser.add_argument("--out-dir", default=None, help="where to write the .fceb files (default: next to the CSV)")
+    parser.add_argument("--parts", default="p1,p2,p3")
+    parser.add_argument("--check-only", action="store_true", help="validate without writing compiled banks")
+    parser.add_argument("--strict", action="store_true", help="exit with status 1 if any row has errors")
+    args = parser.parse_args(argv)
+
+    src_dir = args.data_dir or data_dir()
+    total_err = 0
+    for part in args.parts.split(","):
+        csv_path = os.path.join(src_dir, BANK_SPECS[part][0])
+        if not os.path.exists(csv_path):
+            print(f"{csv_path}: skipped (not found)")
+            continue
+        out_path = None
+        if args.out_dir:
+            os.makedirs(args.out_dir, exist_ok=True)
+            out_path = compiled_path(os.path.join(args.out_dir, BANK_SPECS[part][0]))
+        n_ok, n_err, n_warn = compile_bank(part, csv_path, out_path, args.check_only)
+        total_err += n_err
+        target = "" if args.check_only else f" -> {out_path or compiled_path(csv_path)}"
+        print(f"{csv_path}: {n_ok} items, {n_err} error(s), {n_warn} warning(s){target}")
+    return 1 if args.strict and total_err else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""Recarga en caliente de los bancos de ítems.
+
+Un hilo revisa cada FCE_RELOAD_INTERVAL segundos (por defecto 2; 0 lo desactiva)
+el mtime/tamaño de los bancos que ya se han cargado (los demás se cargan al
+abrir su vista). Cuando uno cambia:
+
+    1. espera a que la firma se mantenga una vuelta más (el archivo ya no se está escribiendo)
+    2. vuelve a leer el CSV, pero solo valida y compila las filas que no estaban
+       en la versión anterior; las demás reutilizan el Item ya compilado
+    3. valida la versión nueva (columnas obligatorias y al menos un ítem válido);
+       si falla, se queda la versión anterior
+    4. la publica con una sola asignación (item_bank.publish)
+
+En modo réplicas (FCE_SHARED_DIR) el paso 2 es compilar el .fceb compartido:
+lo hace la primera réplica que ve el cambio y las demás abren ese mismo archivo.
+
+Los reruns nunca esperan a una recarga. Las sesiones a mitad de ejercicio
+siguen viendo el ítem con el que empezaron: item_bank.find_item lo busca entre
+los ítems que retiraron las recargas si ya no está en el banco actual.
+"""
+import os
+import threading
+import time
+
+import item_bank
+from bank_compiler import iter_rows
+from item_bank import BANK_SPECS, Bank, Item, MappedBank, check_row, compile_row
+from shared_volume import shared_dir
+
+
+class BankReloader:
+    def __init__(self, directory=None, interval=2.0, parts=tuple(BANK_SPECS)):
+        self.directory = directory
+        self.interval = interval
+        self.parts = parts
+        self._rows = {}     # ruta -> (cabecera, {fila: Item}) de la última versión compilada
+        self._pending = {}  # ruta -> firma vista en la vuelta anterior (espera a que se estabilice)
+        self._rejected = {}  # ruta -> firma de una versión que no pasó la validación (no se reintenta)
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None and self.interval > 0:
+                self._thread = threading.Thread(target=self._loop, name="fce-bank-reloader", daemon=True)
+                self._thread.start()
+        return self
+
+    def _loop(self):
+        while True:
+            self.check()
+            time.sleep(self.interval)
+
+    def check(self):
+        """Una vuelta de comprobación. Devuelve {parte: descripción} de lo que se recargó."""
+        done = {}
+        for part in self.parts:
+            try:
+                outcome = self._check_part(part)
+            except Exception as e:
+                outcome = f"kept previous version ({e})"
+                print(f"Error recargando banco {part}: {e}")
+            if outcome:
+                done[part] = outcome
+        return done
+
+    def _check_part(self, part):
+        directory = self.directory or item_bank.data_dir()
+        path = item_bank._pick_source(os.path.join(directory, BANK_SPECS[part][0]))
+        try:
+            st_ = os.stat(path)
+        except OSError:
+            return None
+        signature = (st_.st_mtime_ns, st_.st_size)
+        cached = item_bank._cache.get(path)
+        live = item_bank._live.get((part, os.path.abspath(directory)))
+        if self._rejected.get(path) == signature:
+            return None
+        if cached is None and live is None:  # Nadie lo ha abierto aún: get_bank lo cargará al abrir su vista
+            return None
+        if cached and cached[0] == signature:
+            if live is not cached[1]:  # Primera vuelta: se adopta lo que ya cargó get_bank
+                item_bank.publish(part, directory, path, signature, cached[1])
+                if not path.endswith(".fceb") and path not in self._rows:
+                    # Se indexan sus filas para que la primera recarga solo compile las editadas
+                    try:
+                        self._rebuild(part, path, cached[1].version)
+                    except ValueError:  # Banco sin filas válidas: la recarga lo compilará entero
+                        pass
+            return None
+        # Solo cuando la firma se repite (escritura terminada)
+        if self._pending.get(path) != signature:
+            self._pending[path] = signature
+            return None
+        self._pending.pop(path, None)
+
+        if path.endswith(".fceb"):
+            bank, note = MappedBank.open(path), "compiled bank"
+        elif shared_dir():  # Modo réplicas: se compila el .fceb compartido (una réplica) y se abre
+            try:
+                fceb = item_bank.compile_shared(part, path)
+            except ValueError:
+                self._rejected[path] = signature
+                raise
+            st_ = os.stat(fceb)
+            path, signature = fceb, (st_.st_mtime_ns, st_.st_size)
+            bank, note = MappedBank.open(fceb), "shared compiled bank"
+        else:
+            version = item_bank._file_hash(path)
+            if live is not None and live.version == version:
+                bank, note = live, None  # Solo cambió el mtime
+            else:
+                try:
+                    bank, note = self._rebuild(part, path, version)
+                except ValueError:
+                    self._rejected[path] = signature
+                    raise
+        item_bank.publish(part, directory, path, signature, bank)
+        if note:
+            print(f"Banco {part} recargado ({bank.version[:8]}): {note}")
+        return note
+
+    def _rebuild(self, part, path, version):
+        """Compila la versión nueva reutilizando los ítems de las filas que no cambiaron."""
+        rows = iter_rows(path)
+        _, header, _ = next(rows)
+        missing = [c for c in BANK_SPECS[part][1] if c not in (header or [])]
+        if missing:
+            raise ValueError(f"missing column(s): {', '.join(missing)}")
+        old_header, previous = self._rows.get(path, (None, {}))
+        if old_header != header:
+            previous = {}
+
+        compiled, items, seen = {}, [], {}
+        reused = new = invalid = 0
+        for _, _, row in rows:
+            key = tuple(row)
+            item = previous.get(key)
+            if item is None:
+                # Mismo filtro que la primera carga (item_bank._read_rows)
+                record, _ = check_row(header, row, BANK_SPECS[part][1])
+                if record is None:  # Fila rota (campos de más, vacía, cabecera repetida...): se descarta
+                    invalid += 1
+                    continue
+                item = compile_row(part, record)
+                new += 1
+            else:
+                reused += 1
+            compiled[key] = item
+            # Mismos ids que compile_rows: las repeticiones llevan sufijo
+            n = seen.get(item.id, 0)
+            seen[item.id] = n + 1
+            items.append(item if not n else Item(**{**item.to_dict(), "id": f"{item.id}-{n}"}))
+        if not items:
+            raise ValueError("no valid rows")
+        self._rows[path] = (header, compiled)
+        return Bank(part, path, version, items), f"{reused} unchanged, {new} new/changed, {invalid} skipped row(s)"
+
+
+_reloader = None
+_reloader_lock = threading.Lock()
+
+
+def get_reloader():
+    """Recargador compartido por todo el proceso (arrancado)."""
+    global _reloader
+    if _reloader is None:
+        with _reloader_lock:
+            if _reloader is None:
+                _reloader = BankReloader(interval=float(os.environ.get("FCE_RELOAD_INTERVAL", "2"))).start()
+    return _reloader
@@ -0,0 +1,68 @@
+"""Genera bancos de ítems sintéticos con el mismo formato que los CSV reales.
+
+Uso:
+    python bench/generate_banks.py OUT_DIR --items 10000 [--seed 1]
+"""
+import argparse
+import csv
+import os
+import random
+
+WORDS = ("time people year way day thing man world life hand part child eye woman place work week "
+         "case point government company number group problem fact water money story month lot right "
+         "study book job word business issue side kind head house service friend father power hour").split()
+FUNCTION_WORDS = ["of", "to", "in", "for", "on", "by", "with", "which", "that", "as", "at", "from"]
+ROOTS = [("SUCCESS", "successful"), ("DANGER", "dangerous"), ("HAPPY", "unhappy"), ("DECIDE", "decision"),
+         ("CARE", "careless"), ("POSSIBLE", "impossible"), ("QUICK", "quickly"), ("FRIEND", "friendship")]
+
+
+def _sentence(rng, n=12):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def _cloze_text(rng, n_gaps):
+    parts = [_sentence(rng)]
+    for i in range(1, n_gaps + 1):
+        parts.append(f"{_sentence(rng, 6)[:-1]} _{i}_ {_sentence(rng, 8)}")
+    return " ".join(parts)
+
+
+def write_banks(out_dir, n_items, seed=1):
+    """Escribe fce_part1.csv, fce_open_cloze.csv y fce_data.csv con n_items filas cada uno."""
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+
+    with open(os.path.join(out_dir, "fce_part1.csv"), "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["Title", "Text", "Options", "Answers", "URL"])
+        for i in range(n_items):
+            n = 8
+            groups = [rng.sample(WORDS, 4) for _ in range(n)]
+            answers = [rng.choice(g) for g in groups]
+            w.writerow([f"Synthetic text {i}", _cloze_text(rng, n), "|".join("/".join(g) for g in groups),
+                        "|".join(answers), f"https://example.org/p1/{i}"])
+
+    with open(os.path.join(out_dir, "fce_open_cloze.csv"), "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["Title", "Text", "Answers", "URL"])
+        for i in range(n_items):
+            n = 8
+            w.writerow([f"Synthetic cloze {i}", _cloze_text(rng, n),
+                        "|".join(rng.choice(FUNCTION_WORDS) for _ in range(n)), f"https://example.org/p2/{i}"])
+
+    with open(os.path.join(out_dir, "fce_data.csv"), "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["Root", "Sentence", "Answer"])
+        for i in range(n_items):
+            root, answer = rng.choice(ROOTS)
+            w.writerow([root, f"{_sentence(rng, 5)[:-1]} ______ {_sentence(rng, 4).lower()} ({i})", answer])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir")
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    write_banks(args.out_dir, args.items, args.seed)
+    print(f"Wrote 3 banks with {args.items} items each to {args.out_dir}")
@@ -0,0 +1,244 @@
+"""Prueba de carga headless del simulador con AppTest de Streamlit.
+
+Genera bancos sintéticos del tamaño pedido en una carpeta temporal y simula N
+sesiones concurrentes que recorren los flujos completos:
+
+    part1 / part2 : Start -> responder todos los huecos -> Submit
+    part3         : Start -> (responder -> Check -> Next) x preguntas
+
+Informa de la latencia p50/p95 de cada rerun, del RSS máximo del proceso y de la
+memoria media por sesión. Todo funciona sin red.
+
+Uso:
+    python bench/loadtest.py --sessions 20 --items 5000 [--processes 4] [--flows part1,part2,part3] [--json out.json]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_banks import write_banks  # noqa: E402
+
+APP = os.path.join(ROOT, "app.py")
+
+
+# ==============================================================================
+# 1. MEDICIÓN
+# ==============================================================================
+def current_rss_kb():
+    """RSS actual del proceso en KB (Linux: /proc/self/statm)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def peak_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, round(q / 100 * (len(values) - 1))))
+    return values[k]
+
+
+class Recorder:
+    """Acumula la duración de cada rerun por flujo (thread-safe)."""
+
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def timed(self, flow, action):
+        t0 = time.perf_counter()
+        result = action()
+        dt = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            self.samples.setdefault(flow, []).append(dt)
+        return result
+
+
+# ==============================================================================
+# 2. FLUJOS
+# ==============================================================================
+# AppTest no es thread-safe (crea y destruye un Runtime global en cada run), así
+# que las sesiones concurrentes se simulan intercalando sus reruns: cada flujo es
+# un generador que cede el control tras cada rerun y el planificador las recorre
+# en round-robin manteniéndolas todas vivas. Para usar varios núcleos se reparten
+# las sesiones entre procesos (--processes).
+def _new_app(view, sid):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.query_params["view"] = view
+    at.query_params["sid"] = sid
+    return at
+
+
+def _check(at):
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return at
+
+
+def _button(at, *labels):
+    for b in at.button:
+        if any(label in b.label for label in labels):
+            return b
+    raise LookupError(f"Button not found: {labels}")
+
+
+def flow_cloze(rec, flow, sid):
+    """Part 1 / Part 2: empezar, rellenar todos los huecos y enviar."""
+    at = _new_app(flow, sid)
+    _check(rec.timed(flow, at.run))
+    yield at
+    _check(rec.timed(flow, _button(at, "Start").click().run))
+    yield at
+    for r in at.radio:
+        if r.key and r.key.startswith("p1_q"):
+            r.set_value(r.options[0])
+    for t in at.text_input:
+        if t.key and t.key.startswith("p2_q"):
+            t.input("of")
+    _check(rec.timed(flow, _button(at, "Submit Answers").click().run))
+    yield at
+
+
+def flow_part3(rec, sid, questions):
+    at = _new_app("part3", sid)
+    _check(rec.timed("part3", at.run))
+    yield at
+    at.number_input[0].set_value(questions)
+    _check(rec.timed("part3", _button(at, "Start").click().run))
+    yield at
+    for _ in range(questions):
+        at.text_input[0].input("answer")
+        _check(rec.timed("part3", _button(at, "Check").click().run))
+        yield at
+        _check(rec.timed("part3", _button(at, "Next Question", "See Results").click().run))
+        yield at
+
+
+def session_flow(rec, flows, n, questions):
+    """Una sesión recorre los flujos pedidos uno tras otro."""
+    for flow in flows:
+        sid = f"bench-{os.getpid()}-{flow}-{n}"
+        if flow == "part3":
+            yield from flow_part3(rec, sid, questions)
+        else:
+            yield from flow_cloze(rec, flow, sid)
+
+
+def run_interleaved(rec, flows, session_ids, questions):
+    """Avanza todas las sesiones en round-robin; devuelve las apps para mantenerlas vivas."""
+    live = {n: session_flow(rec, flows, n, questions) for n in session_ids}
+    apps = {}
+    while live:
+        for n in list(live):
+            try:
+                apps[n] = next(live[n])
+            except StopIteration:
+                del live[n]
+    return list(apps.values())
+
+
+def _worker(flows, session_ids, questions):
+    """Proceso de carga: devuelve sus muestras y su memoria."""
+    run_interleaved(Recorder(), flows, [-1], questions)  # Calentamiento fuera de la medida
+    rec = Recorder()
+    rss_before = current_rss_kb()
+    alive = run_interleaved(rec, flows, session_ids, questions)
+    rss_after = current_rss_kb()
+    del alive
+    return {"samples": rec.samples, "session_kb": max(0, rss_after - rss_before), "peak_kb": peak_rss_kb()}
+
+
+# ==============================================================================
+# 3. PROGRAMA PRINCIPAL
+# ==============================================================================
+def run(sessions, items, flows, questions=5, processes=1, data_dir=None):
+    tmp = tempfile.mkdtemp(prefix="fce-bench-")
+    data_dir = data_dir or os.path.join(tmp, "banks")
+    if not os.path.exists(os.path.join(data_dir, "fce_part1.csv")):
+        write_banks(data_dir, items)
+    os.environ["FCE_DATA_DIR"] = data_dir
+    # Estado, estadísticas y registro de intentos en la carpeta temporal: la carga no toca los de la app
+    os.environ.setdefault("FCE_STATE_DB", os.path.join(tmp, "state.db"))
+    os.environ.setdefault("FCE_STATS_DB", os.path.join(tmp, "stats.db"))
+    os.environ.setdefault("FCE_ATTEMPT_LOG", os.path.join(tmp, "attempts.jsonl"))
+    os.environ.setdefault("FCE_RELOAD_INTERVAL", "0")  # Sin recargador en segundo plano durante la medida
+
+    chunks = [list(range(sessions))[i::processes] for i in range(processes)]
+    t0 = time.perf_counter()
+    if processes == 1:
+        results = [_worker(flows, chunks[0], questions)]
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(processes) as pool:
+            results = pool.starmap(_worker, [(flows, c, questions) for c in chunks if c])
+    wall = time.perf_counter() - t0
+
+    samples = {}
+    for r in results:
+        for flow, values in r["samples"].items():
+            samples.setdefault(flow, []).extend(values)
+
+    report = {
+        "sessions": sessions,
+        "processes": processes,
+        "items_per_bank": items,
+        "wall_s": round(wall, 3),
+        "peak_rss_mb": round(max(r["peak_kb"] for r in results) / 1024, 1),
+        "per_session_kb": round(sum(r["session_kb"] for r in results) / max(1, sessions), 1),
+        "flows": {},
+    }
+    for flow, values in sorted(samples.items()):
+        report["flows"][flow] = {
+            "reruns": len(values),
+            "p50_ms": round(statistics.median(values), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "max_ms": round(max(values), 2),
+        }
+    return report
+
+
+def print_report(report):
+    print(f"Sessions: {report['sessions']} ({report['processes']} process(es))  |  "
+          f"Items per bank: {report['items_per_bank']}  |  Wall: {report['wall_s']}s")
+    print(f"{'flow':<8}{'reruns':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for flow, r in report["flows"].items():
+        print(f"{flow:<8}{r['reruns']:>8}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['max_ms']:>10}")
+    print(f"Peak RSS: {report['peak_rss_mb']} MB (per process)  |  Memory per session: {report['per_session_kb']} KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent sessions")
+    parser.add_argument("--items", type=int, default=1000, help="items per generated bank")
+    parser.add_argument("--flows", default="part1,part2,part3")
+    parser.add_argument("--questions", type=int, default=5, help="Part 3 questions per session")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes sharing the sessions")
+    parser.add_argument("--data-dir", default=None, help="reuse an existing bank folder instead of generating one")
+    parser.add_argument("--json", default=None, help="write the report as JSON to this file")
+    args = parser.parse_args()
+
+    report = run(args.sessions, args.items, args.flows.split(","), args.questions, args.processes, args.data_dir)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
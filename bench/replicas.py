@@ -0,0 +1,176 @@
+"""Prueba local del modo réplicas: varios procesos sobre la misma carpeta compartida.
+
+Simula en una sola máquina lo que pasa detrás del balanceador:
+
+    1. arranque en frío: N procesos piden a la vez los tres bancos. Cada banco
+       se tiene que compilar una sola vez y todos deben ver la misma versión.
+    2. F5 en otra réplica: para cada parte, un proceso empieza el ejercicio (en
+       Part 3 además contesta la primera pregunta y pasa a la segunda) y otro
+       proceso distinto abre la misma sesión (?sid=) y debe ver lo mismo.
+    3. registro de intentos: N procesos corrigen a la vez y el log compartido
+       tiene que quedar con una línea JSON válida por lote.
+
+Cada réplica es un proceso nuevo de Python con FCE_SHARED_DIR apuntando a la
+misma carpeta temporal. Sale con estado 1 si algo falla.
+
+Uso:
+    python bench/replicas.py [--replicas 4] [--items 500]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH)
+
+from generate_banks import write_banks  # noqa: E402
+
+APP = os.path.join(ROOT, "app.py")
+VIEWS = {"p1": "part1", "p2": "part2", "p3": "part3"}
+
+
+# ==============================================================================
+# 1. LO QUE HACE CADA RÉPLICA (EN SU PROPIO PROCESO)
+# ==============================================================================
+def replica_banks():
+    import item_bank
+    return {part: item_bank.get_bank(part).version for part in item_bank.BANK_SPECS}
+
+
+def _open_app(part, sid):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.query_params["view"] = VIEWS[part]
+    at.query_params["sid"] = sid
+    at.run()
+    return _check(at)
+
+
+def _check(at):
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return at
+
+
+def _click(at, label):
+    next(b for b in at.button if label in b.label).click().run()
+    return _check(at)
+
+
+def _screen(at):
+    """Lo que identifica el ejercicio en pantalla: el texto (o la raíz y la frase) y el progreso."""
+    boxes = [m.value for m in at.markdown if "text-box" in m.value or "root-word" in m.value]
+    progress = [p.value for p in at.get("progress")]
+    return {"boxes": boxes, "progress": progress}
+
+
+def replica_start(part, sid):
+    """Réplica A: empieza el ejercicio (en Part 3, contesta la 1ª pregunta y pasa a la 2ª)."""
+    at = _click(_open_app(part, sid), "Start")
+    if part == "p3":
+        at.text_input[0].input("answer")
+        _click(at, "Check")
+        _click(at, "Next")
+    return _screen(at)
+
+
+def replica_resume(part, sid):
+    """Réplica B: abre la misma sesión desde cero (como tras un F5 que cae en otra réplica)."""
+    return _screen(_open_app(part, sid))
+
+
+def replica_grade(n):
+    from attempt_log import get_log
+    log = get_log()
+    for i in range(n):
+        log.record(f"learner-{os.getpid()}", "p2", f"item-{i}", ["of"] * 40, [True] * 40, 10.0, 300)
+        log.flush()
+    return n
+
+
+# ==============================================================================
+# 2. ORQUESTACIÓN
+# ==============================================================================
+def _spawn(env, call):
+    """Lanza una réplica: proceso nuevo con su propio directorio de trabajo (como otro contenedor)."""
+    cwd = tempfile.mkdtemp(prefix="replica-", dir=env["FCE_BENCH_TMP"])
+    code = f"import json, sys; sys.path.insert(0, {BENCH!r}); import replicas; print(json.dumps(replicas.{call}))"
+    return subprocess.Popen([sys.executable, "-c", code], env=env, cwd=cwd,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+
+def _result(proc):
+    out, err = proc.communicate()
+    if proc.returncode:
+        raise RuntimeError(err.strip().splitlines()[-1] if err.strip() else "replica failed")
+    lines = out.strip().splitlines()
+    return json.loads(lines[-1]), lines[:-1]
+
+
+def run(replicas, items):
+    tmp = tempfile.mkdtemp(prefix="fce-replicas-")
+    data_dir, shared = os.path.join(tmp, "banks"), os.path.join(tmp, "shared")
+    write_banks(data_dir, items)
+    os.makedirs(shared)
+    env = {**os.environ, "FCE_DATA_DIR": data_dir, "FCE_SHARED_DIR": shared, "PYTHONPATH": ROOT,
+           "FCE_RELOAD_INTERVAL": "0", "FCE_BENCH_TMP": tmp}
+    for name in ("FCE_STATE_DB", "FCE_STATS_DB", "FCE_ATTEMPT_LOG", "FCE_STATE_BACKEND"):
+        env.pop(name, None)
+    failures = []
+
+    # 1. Arranque en frío simultáneo
+    results = [_result(p) for p in [_spawn(env, "replica_banks()") for _ in range(replicas)]]
+    versions = {json.dumps(v, sort_keys=True) for v, _ in results}
+    compiles = sum(1 for _, log in results for line in log if "compilado" in line)
+    ok = len(versions) == 1 and compiles == 3
+    print(f"cold start: {replicas} replicas, {compiles} compilation(s), {len(versions)} distinct version set(s)"
+          f" -> {'ok' if ok else 'FAIL'}")
+    if not ok:
+        failures.append("cold start")
+
+    # 2. F5 que cae en otra réplica
+    for part in VIEWS:
+        sid = f"replica-test-{part}"
+        before, _ = _result(_spawn(env, f"replica_start({part!r}, {sid!r})"))
+        after, _ = _result(_spawn(env, f"replica_resume({part!r}, {sid!r})"))
+        ok = bool(before["boxes"]) and before == after
+        print(f"resume {part} on another replica: {'ok' if ok else 'FAIL'} {after['progress']}")
+        if not ok:
+            failures.append(f"resume {part}")
+
+    # 3. Registro de intentos escrito a la vez por todas las réplicas
+    per_replica = 20
+    [_result(p) for p in [_spawn(env, f"replica_grade({per_replica})") for _ in range(replicas)]]
+    graded = broken = 0
+    with open(os.path.join(shared, "fce_attempts.jsonl"), encoding="utf-8") as f:
+        for line in f:
+            try:
+                batch = json.loads(line)
+            except ValueError:
+                broken += 1
+                continue
+            graded += batch["part"][:1] == ["p2"]
+    ok = graded == replicas * per_replica and not broken
+    print(f"shared attempt log: {graded}/{replicas * per_replica} batch line(s), {broken} broken"
+          f" -> {'ok' if ok else 'FAIL'}")
+    if not ok:
+        failures.append("attempt log")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replicas", type=int, default=4)
+    parser.add_argument("--items", type=int, default=500, help="items per synthetic bank")
+    args = parser.parse_args(argv)
+    failures = run(args.replicas, args.items)
+    print("FAILED: " + ", ".join(failures) if failures else "all checks passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
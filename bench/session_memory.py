@@ -0,0 +1,89 @@
+"""Memoria por sesión: payload antiguo (objetos pandas) frente a ids de ítems.
+
+Construye N sesiones con cada representación sobre el mismo banco y mide con
+tracemalloc los bytes que añade cada sesión. El banco compartido se carga antes
+de empezar a medir, así que solo se cuenta lo que vive en st.session_state.
+
+    antes   : p1_data / p2_data = pandas.Series, p3_data = DataFrame de 5 filas
+              (y, tras un F5, el dict recuperado del JSON con copias del texto)
+    después : p1_item / p2_item = id, p3_items = lista de ids, respuestas y baraja
+
+Uso:
+    python bench/session_memory.py --sessions 500 --items 5000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_banks import write_banks  # noqa: E402
+
+
+def legacy_session(frames, restored):
+    """Lo que guardaba una sesión antes: filas de pandas (o su copia JSON tras un F5)."""
+    p1 = frames["p1"].sample(1).iloc[0]
+    p2 = frames["p2"].sample(1).iloc[0]
+    p3 = frames["p3"].sample(5).reset_index(drop=True)
+    if restored:
+        p1 = json.loads(json.dumps(p1.to_dict()))
+        p2 = json.loads(json.dumps(p2.to_dict()))
+    return {"p1_data": p1, "p2_data": p2, "p3_data": p3,
+            "p1_active": True, "p2_active": True, "p3_active": True}
+
+
+def compact_session(banks, decks):
+    from sampler import draw_items
+    return {
+        "p1_item": draw_items(decks, banks["p1"])[0].id,
+        "p2_item": draw_items(decks, banks["p2"])[0].id,
+        "p3_items": [item.id for item in draw_items(decks, banks["p3"], 5)],
+        "p3_answers": [],
+        "decks": decks,
+        "p1_active": True, "p2_active": True, "p3_active": True,
+    }
+
+
+def measure(build, n):
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    sessions = [build() for _ in range(n)]
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del sessions
+    return used / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--items", type=int, default=2000)
+    args = parser.parse_args()
+
+    import pandas as pd
+    from item_bank import BANK_SPECS, get_bank
+
+    data_dir = tempfile.mkdtemp(prefix="fce-mem-")
+    write_banks(data_dir, args.items)
+    frames = {p: pd.read_csv(os.path.join(data_dir, f)).dropna(subset=cols) for p, (f, cols) in BANK_SPECS.items()}
+    banks = {p: get_bank(p, data_dir) for p in BANK_SPECS}
+
+    before = measure(lambda: legacy_session(frames, restored=False), args.sessions)
+    before_f5 = measure(lambda: legacy_session(frames, restored=True), args.sessions)
+    after = measure(lambda: compact_session(banks, {}), args.sessions)
+
+    print(f"Sessions: {args.sessions}  |  Items per bank: {args.items}")
+    print(f"{'payload':<28}{'bytes/session':>14}")
+    print(f"{'before (pandas objects)':<28}{before:>14.0f}")
+    print(f"{'before, after F5 (JSON)':<28}{before_f5:>14.0f}")
+    print(f"{'after (item ids)':<28}{after:>14.0f}")
+    print(f"Reduction: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
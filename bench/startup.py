@@ -0,0 +1,90 @@
+"""Mide el arranque en frío y el coste de cada rerun de cada vista.
+
+Cada vista se mide en un proceso nuevo (imports y bancos sin cachear):
+
+    first paint   primer run de la app en ese proceso (lo que espera quien abre la URL)
+    rerun         mediana de los reruns siguientes sin interacción
+
+También indica si pandas llegó a importarse. Los bancos son sintéticos y se
+generan en una carpeta temporal.
+
+Uso:
+    python bench/startup.py [--views home,part1,part2,part3] [--items 5000] [--reruns 20] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_banks import write_banks  # noqa: E402
+
+APP = os.path.join(ROOT, "app.py")
+
+
+def measure_view(view, reruns):
+    """Se ejecuta en el proceso hijo: devuelve las medidas de una vista."""
+    t0 = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    t_import = time.perf_counter() - t0
+
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.query_params["view"] = view
+    t0 = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - t0
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+    samples = []
+    for _ in range(reruns):
+        t0 = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - t0)
+    return {"view": view, "streamlit_import_ms": t_import * 1000, "first_paint_ms": first * 1000,
+            "rerun_ms": statistics.median(samples) * 1000, "pandas_loaded": "pandas" in sys.modules}
+
+
+def run(views, items, reruns):
+    tmp = tempfile.mkdtemp(prefix="fce-startup-")
+    data_dir = os.path.join(tmp, "banks")
+    write_banks(data_dir, items)
+    # Estado, estadísticas y registro de intentos en la carpeta temporal, sin recargador en segundo plano
+    env = {**os.environ, "FCE_DATA_DIR": data_dir, "PYTHONPATH": ROOT, "FCE_RELOAD_INTERVAL": "0",
+           "FCE_STATE_DB": os.path.join(tmp, "state.db"), "FCE_STATS_DB": os.path.join(tmp, "stats.db"),
+           "FCE_ATTEMPT_LOG": os.path.join(tmp, "attempts.jsonl")}
+    results = []
+    for view in views:
+        code = (f"import json, sys; sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r}); "
+                f"from startup import measure_view; print(json.dumps(measure_view({view!r}, {reruns})))")
+        out = subprocess.run([sys.executable, "-c", code], env=env, cwd=tmp, capture_output=True, text=True,
+                             check=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {"items_per_bank": items, "reruns": reruns, "views": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--views", default="home,part1,part2,part3")
+    parser.add_argument("--items", type=int, default=5000, help="items per synthetic bank")
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--json", default=None, help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = run(args.views.split(","), args.items, args.reruns)
+    print(f"{'view':<10}{'first paint':>14}{'rerun p50':>12}  pandas")
+    for r in report["views"]:
+        print(f"{r['view']:<10}{r['first_paint_ms']:>11.0f} ms{r['rerun_ms']:>9.1f} ms  {'yes' if r['pandas_loaded'] else 'no'}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""Generador offline de textos de Part 2 (open cloze) a partir de un corpus.
+
+Lee en streaming un corpus local, lo parte en párrafos y, en los que tienen la
+longitud de un texto del examen, sustituye algunas palabras gramaticales
+(preposiciones, relativos, conjunciones...) por huecos `_n_`. Escribe filas con
+el esquema de fce_open_cloze.csv (Title,Text,Answers,URL).
+
+Formatos de entrada (también comprimidos con gzip, `.gz`):
+
+    jsonl   un documento por línea: {"title": ..., "text": ..., "url": ...}
+            (la salida --json de WikiExtractor o los volcados de Wikipedia de HF)
+    text    texto plano con párrafos separados por líneas en blanco. Si trae las
+            marcas `<doc url=".." title="..">` de WikiExtractor, se usan como
+            título/URL y cada línea es un párrafo.
+
+El trabajo va en tubería: el proceso principal lee documentos y los agrupa en
+lotes, un pool de procesos genera las filas y el principal las escribe en
+orden. Nunca hay más de 2 lotes por proceso en vuelo, así que la memoria no
+depende del tamaño del corpus. Los huecos de cada párrafo se eligen con una
+semilla derivada del propio texto: la salida es la misma con 1 o con N procesos.
+
+Uso:
+    python cloze_generator.py CORPUS [--out FILE] [--format auto|jsonl|text] [--gaps 3]
+                              [--spacing 8] [--min-words 40] [--max-words 140] [--per-doc 1]
+                              [--kinds prepositions,...] [--processes N] [--batch 200] [--limit N]
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import random
+import re
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from bank_compiler import validate_row
+from item_bank import ALT_SEP
+from parallel import bounded_map
+from search import WORD_TAGS
+
+HEADER = ["Title", "Text", "Answers", "URL"]
+DEFAULT_KINDS = ("prepositions", "relative pronouns", "conjunctions", "auxiliaries", "quantifiers")
+
+WORD_RE = re.compile(r"[A-Za-z]+")
+DOC_RE = re.compile(r"<doc\b([^>]*)>")
+ATTR_RE = re.compile(r'(\w+)="([^"]*)"')
+SENTENCE_END_RE = re.compile(r"[.!?][\"')\]]?(?=\s|$)")
+# Restos de marcado o caracteres que romperían los huecos `_n_`
+MARKUP_RE = re.compile(r"[_|{}\[\]<>=#*\\]|https?:")
+
+
+# ==============================================================================
+# 1. LECTURA DEL CORPUS (STREAMING)
+# ==============================================================================
+def _open(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, encoding="utf-8", errors="replace")
+
+
+def detect_format(path):
+    name = path[:-3] if path.endswith(".gz") else path
+    return "jsonl" if name.endswith((".jsonl", ".json", ".ndjson")) else "text"
+
+
+def _jsonl_documents(f):
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            doc = json.loads(line)
+        except ValueError:
+            continue
+        text = doc.get("text") if isinstance(doc, dict) else None
+        if text:
+            yield str(doc.get("title") or ""), str(doc.get("url") or ""), text.split("\n")
+
+
+def _text_documents(f, default_title):
+    title, url, in_doc, paragraphs, lines = default_title, "", False, [], []
+    for line in f:
+        stripped = line.strip()
+        match = DOC_RE.match(stripped)
+        if match:  # <doc ...>: empieza un artículo de WikiExtractor
+            attrs = dict(ATTR_RE.findall(match.group(1)))
+            title, url, in_doc, paragraphs = attrs.get("title", default_title), attrs.get("url", ""), True, []
+            continue
+        if stripped == "</doc>":
+            yield title, url, paragraphs
+            title, url, in_doc, paragraphs = default_title, "", False, []
+            continue
+        if in_doc:
+            if stripped and stripped != title:  # La primera línea repite el título
+                paragraphs.append(stripped)
+        elif stripped:
+            lines.append(stripped)
+        elif lines:  # Línea en blanco: fin de párrafo (cada párrafo suelto es su propio documento)
+            yield title, url, [" ".join(lines)]
+            lines = []
+    if in_doc and paragraphs:
+        yield title, url, paragraphs
+    if lines:
+        yield title, url, [" ".join(lines)]
+
+
+def read_documents(path, fmt="auto"):
+    """Genera (título, url, [párrafos]) documento a documento."""
+    fmt = detect_format(path) if fmt == "auto" else fmt
+    default_title = os.path.basename(path).split(".")[0]
+    with _open(path) as f:
+        if fmt == "jsonl":
+            yield from _jsonl_documents(f)
+        else:
+            yield from _text_documents(f, default_title)
+
+
+def batched(documents, size):
+    batch = []
+    for doc in documents:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ==============================================================================
+# 2. SELECCIÓN DE HUECOS
+# ==============================================================================
+def gap_words(kinds=DEFAULT_KINDS):
+    """Palabras que pueden ser hueco: las de las categorías de search.WORD_TAGS pedidas."""
+    unknown = [k for k in kinds if k not in WORD_TAGS]
+    if unknown:
+        raise ValueError(f"unknown kind(s): {', '.join(unknown)} (choose from {', '.join(WORD_TAGS)})")
+    return frozenset(w for k in kinds for w in WORD_TAGS[k])
+
+
+def usable(paragraph, min_words, max_words):
+    """¿Parece un párrafo de prosa de la longitud de un texto del examen?"""
+    n = len(paragraph.split())
+    return (min_words <= n <= max_words and paragraph[-1] in ".!?\"'" and not MARKUP_RE.search(paragraph)
+            and len(SENTENCE_END_RE.findall(paragraph)) >= 2)
+
+
+def _candidates(paragraph, words):
+    """[(nº de palabra, match)] de las palabras que pueden ser hueco."""
+    out = []
+    matches = list(WORD_RE.finditer(paragraph))
+    for i, m in enumerate(matches[1:-1], start=1):  # Ni la primera ni la última palabra
+        word = m.group()
+        if word not in words:  # En minúscula: nunca al principio de una frase
+            continue
+        before = paragraph[m.start() - 1]
+        after = paragraph[m.end():m.end() + 1]
+        if before in "-'’" or after in ("-", "'", "’"):  # Parte de "well-known", "don't"...
+            continue
+        out.append((i, m))
+    return out
+
+
+def _answer(paragraph, m):
+    """Respuesta del hueco; en las relativas especificativas (sin coma delante) vale también "that"."""
+    word = m.group()
+    before = paragraph[:m.start()].rstrip()
+    # "in which" no admite "that"
+    preposition = before.rsplit(None, 1)[-1:] and before.rsplit(None, 1)[-1].lower() in WORD_TAGS["prepositions"]
+    if word in ("which", "who") and before[-1:] not in ",;" and not preposition:
+        return f"{word}{ALT_SEP}that"
+    return word
+
+
+def make_cloze(paragraph, words, n_gaps, spacing, seed=0):
+    """(texto con huecos, respuestas) o None si no caben n_gaps huecos separados `spacing` palabras."""
+    candidates = _candidates(paragraph, words)
+    if len(candidates) < n_gaps:
+        return None
+    rng = random.Random(zlib.crc32(paragraph.encode("utf-8")) ^ seed)
+    rng.shuffle(candidates)
+    chosen, used = [], set()
+    # Primera pasada sin repetir respuesta; si no llega, se permiten repeticiones
+    for allow_repeat in (False, True):
+        for i, m in candidates:
+            if len(chosen) == n_gaps:
+                break
+            if (i, m) in chosen or (not allow_repeat and m.group() in used):
+                continue
+            if all(abs(i - j) >= spacing for j, _ in chosen):
+                chosen.append((i, m))
+                used.add(m.group())
+    if len(chosen) < n_gaps:
+        return None
+
+    chosen.sort()
+    parts, answers, last = [], [], 0
+    for n, (_, m) in enumerate(chosen, start=1):
+        parts.append(paragraph[last:m.start()])
+        parts.append(f"_{n}_")
+        answers.append(_answer(paragraph, m))
+        last = m.end()
+    parts.append(paragraph[last:])
+    return "".join(parts), answers
+
+
+# ==============================================================================
+# 3. TRABAJO POR LOTES (PROCESOS)
+# ==============================================================================
+_options = None
+
+
+def _init_worker(options):
+    global _options
+    _options = options
+
+
+def _process_batch(batch):
+    """(filas generadas, nº de documentos, nº de párrafos revisados) de un lote."""
+    o = _options
+    rows, seen = [], 0
+    for title, url, paragraphs in batch:
+        made = 0
+        for paragraph in paragraphs:
+            if made >= o["per_doc"]:
+                break
+            paragraph = " ".join(paragraph.split())
+            seen += 1
+            if not paragraph or not usable(paragraph, o["min_words"], o["max_words"]):
+                continue
+            cloze = make_cloze(paragraph, o["words"], o["gaps"], o["spacing"], o["seed"])
+            if cloze is None:
+                continue
+            row = [title.strip() or paragraph.split(".")[0][:60], cloze[0], "|".join(cloze[1]), url.strip()]
+            errors, _, _ = validate_row("p2", HEADER, row)  # Lo mismo que comprobaría bank_compiler
+            if errors:
+                continue
+            rows.append(row)
+            made += 1
+    return rows, len(batch), seen
+
+
+def generate(corpus, out, fmt="auto", processes=None, batch_size=200, limit=None, **options):
+    """Escribe en `out` (fichero abierto) las filas generadas. Devuelve (documentos, párrafos, filas)."""
+    options = {"words": gap_words(options.pop("kinds", DEFAULT_KINDS)), "gaps": 3, "spacing": 8,
+               "min_words": 40, "max_words": 140, "per_doc": 1, "seed": 0, **options}
+    writer = csv.writer(out)
+    writer.writerow(HEADER)
+    batches = batched(read_documents(corpus, fmt), batch_size)
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        _init_worker(options)
+        pool, results = None, map(_process_batch, batches)
+    else:
+        pool = ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(options,))
+        results = bounded_map(pool, _process_batch, batches, processes * 2)
+
+    n_docs = n_paragraphs = n_rows = 0
+    try:
+        for rows, docs, seen in results:
+            n_docs += docs
+            n_paragraphs += seen
+            if limit is not None:
+                rows = rows[:limit - n_rows]
+            writer.writerows(rows)
+            n_rows += len(rows)
+            if limit is not None and n_rows >= limit:
+                break
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+    return n_docs, n_paragraphs, n_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", help="plain-text or JSONL corpus (optionally .gz)")
+    parser.add_argument("--out", default=None, help="CSV to write (default: stdout)")
+    parser.add_argument("--format", default="auto", choices=["auto", "jsonl", "text"])
+    parser.add_argument("--gaps", type=int, default=3, help="gaps per text")
+    parser.add_argument("--spacing", type=int, default=8, help="minimum words between two gaps")
+    parser.add_argument("--min-words", type=int, default=40)
+    parser.add_argument("--max-words", type=int, default=140)
+    parser.add_argument("--per-doc", type=int, default=1, help="texts taken from each document")
+    parser.add_argument("--kinds", default=",".join(DEFAULT_KINDS),
+                        help=f"word kinds that can be gapped (from: {', '.join(WORD_TAGS)})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--batch", type=int, default=200, help="documents per batch")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many texts")
+    args = parser.parse_args(argv)
+
+    kinds = [k.strip().replace("-", " ") for k in args.kinds.split(",") if k.strip()]
+    out = open(args.out, "w", newline="", encoding="utf-8") if args.out else sys.stdout
+    t0 = time.perf_counter()
+    try:
+        n_docs, n_paragraphs, n_rows = generate(
+            args.corpus, out, args.format, args.processes, args.batch, args.limit, kinds=kinds,
+            gaps=args.gaps, spacing=args.spacing, min_words=args.min_words, max_words=args.max_words,
+            per_doc=args.per_doc, seed=args.seed)
+    finally:
+        if args.out:
+            out.close()
+    elapsed = time.perf_counter() - t0
+    print(f"{n_rows} text(s) from {n_docs} document(s), {n_paragraphs} paragraph(s) in {elapsed:.2f}s "
+          f"({n_paragraphs / elapsed if elapsed else 0:.0f} paragraphs/s)", file=sys.stderr)
+    return 0 if n_rows else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
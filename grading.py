@@ -0,0 +1,307 @@
+"""Corrección de respuestas, independiente de Streamlit.
+
+Las mismas reglas sirven para la app (un envío cada vez) y para corregir en
+lote las hojas de respuestas de un grupo entero:
+
+    * Part 1: coincidencia exacta con la opción (en papel vale también la letra A-D)
+    * Part 2 y Part 3: la respuesta normalizada (minúsculas, comillas y espacios
+      unificados, contracciones desplegadas, ortografía británica) debe estar
+      entre las aceptadas del hueco ("which/that" en el CSV = dos respuestas válidas)
+
+Formato de las hojas (CSV con cabecera):
+
+    Student,Item,Answers
+    ana,p2-1a2b3c4d5e6f,of|the|which|...      <- respuestas de cada hueco separadas por |
+
+`Item` es el id del ítem (o su título, si es único en el banco). El lote se
+corrige con pandas (comparación vectorizada sobre una fila por hueco) y los
+trozos del CSV se reparten entre varios procesos.
+
+Uso:
+    python grading.py --part p2 --sheets answers.csv [--out results.csv] [--data-dir DIR]
+                      [--processes N] [--chunksize ROWS]
+"""
+import argparse
+import os
+import sys
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+
+from item_bank import BANK_SPECS, get_bank
+from parallel import bounded_map
+
+LETTERS = "ABCD"
+SEPARATOR = "|"
+
+
+@dataclass(frozen=True)
+class Grade:
+    """Resultado de un envío: respuestas normalizadas y acierto por hueco.
+
+    `expected` trae las respuestas aceptadas de cada hueco tal como se muestran ("which / that").
+    """
+    item_id: str
+    given: tuple
+    expected: tuple
+    correct: tuple
+
+    @property
+    def score(self):
+        return sum(self.correct)
+
+    @property
+    def total(self):
+        return len(self.expected)
+
+
+# ==============================================================================
+# 1. NORMALIZACIÓN
+# ==============================================================================
+# Comillas y guiones tipográficos -> ASCII
+_FOLD = str.maketrans({"\u2018": "'", "\u2019": "'", "\u201a": "'", "\u201b": "'", "\u02bc": "'",
+                       "\u00b4": "'", "`": "'", "\u201c": '"', "\u201d": '"', "\u201e": '"',
+                       "\u2010": "-", "\u2011": "-", "\u2013": "-", "\u2014": "-"})
+
+# Contracciones -> forma completa ('s y 'd son ambiguas y se dejan como están)
+_CONTRACTIONS = {"can't": "cannot", "won't": "will not", "shan't": "shall not", "i'm": "i am",
+                 "can not": "cannot", "n't": " not", "'re": " are", "'ve": " have", "'ll": " will"}
+_CONTRACTION_RE = re.compile(r"\b(?:can't|won't|shan't|i'm|can not)\b|n't\b|'re\b|'ve\b|'ll\b")
+
+# Ortografía americana -> británica (la del examen): raíz -> (forma británica, sufijos con los
+# que la raíz forma palabras reales). Así "metering" o "programmer" no se tocan.
+_SPELLING_STEMS = {
+    "color": ("colour", "s ed ing ful less ist ists"), "favor": ("favour", "s ed ing able ably"),
+    "favorite": ("favourite", "s"), "flavor": ("flavour", "s ed ing ful less"),
+    "behavior": ("behaviour", "s al"), "honor": ("honour", "s ed ing able ably"),
+    "humor": ("humour", "s ed ing less"), "labor": ("labour", "s ed ing er ers"),
+    "neighbor": ("neighbour", "s ing ly hood hoods"), "rumor": ("rumour", "s ed"),
+    "harbor": ("harbour", "s ed ing"), "center": ("centre", "s"), "centered": ("centred", ""),
+    "centering": ("centring", ""), "theater": ("theatre", "s"), "meter": ("metre", "s"),
+    "liter": ("litre", "s"), "fiber": ("fibre", "s"), "traveled": ("travelled", ""),
+    "traveling": ("travelling", ""), "traveler": ("traveller", "s"), "canceled": ("cancelled", ""),
+    "canceling": ("cancelling", ""), "jewelry": ("jewellery", ""), "gray": ("grey", "s ed ing er est ish"),
+    "defense": ("defence", "s less"), "offense": ("offence", "s"), "license": ("licence", "s"),
+    "catalog": ("catalogue", "s"), "cataloged": ("catalogued", ""), "cataloging": ("cataloguing", ""),
+    "dialog": ("dialogue", "s"), "program": ("programme", "s"), "mold": ("mould", "s ed ing y"),
+    "plow": ("plough", "s ed ing"), "pajamas": ("pyjamas", ""), "skeptical": ("sceptical", "ly"),
+}
+_SPELLING = {stem + suf: brit + suf for stem, (brit, suffixes) in _SPELLING_STEMS.items()
+             for suf in ("", *suffixes.split())}
+# -ize/-yze -> -ise/-yse salvo palabras donde "iz" no es sufijo (size, seize, prize, capsize...)
+_IZE_RE = re.compile(r"^([a-z]{3,})(i|y)z(e|es|ed|ing|ation|ations|er|ers)$")
+_IZE_KEEP = {"caps", "downs", "ups", "overs", "outs", "supers"}
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def _british(match):
+    word = match.group(0)
+    if word in _SPELLING:
+        return _SPELLING[word]
+    ize = _IZE_RE.match(word)
+    if ize and ize.group(1) not in _IZE_KEEP:
+        return f"{ize.group(1)}{ize.group(2)}s{ize.group(3)}"
+    return word
+
+
+def normalize(part, answer):
+    """Forma canónica de una respuesta para compararla.
+
+    Siempre: Unicode NFKC, comillas/guiones tipográficos a ASCII y espacios colapsados.
+    Part 2 y 3 además: minúsculas, contracciones desplegadas y ortografía británica.
+    Part 1 respeta mayúsculas: la respuesta es una de las opciones.
+    """
+    answer = "" if answer is None else unicodedata.normalize("NFKC", str(answer)).translate(_FOLD)
+    if part != "p1":
+        answer = _CONTRACTION_RE.sub(lambda m: _CONTRACTIONS[m.group(0)], answer.lower())
+        answer = _WORD_RE.sub(_british, answer)
+    return " ".join(answer.split())
+
+
+@lru_cache(maxsize=65536)
+def answer_table(item):
+    """Tabla precompilada del ítem: por hueco, el conjunto de formas normalizadas aceptadas.
+
+    Se construye la primera vez que se corrige el ítem; después cada hueco es una
+    consulta O(1) en un frozenset, tenga las alternativas que tenga.
+    """
+    return tuple(frozenset(normalize(item.part, a) for a in item.accepted(g)) for g in range(item.n_gaps))
+
+
+# ==============================================================================
+# 2. REGLAS (UN ENVÍO)
+# ==============================================================================
+def _resolve_letter(options, answer):
+    """En Part 1 una letra suelta (A-D) se lee como la opción correspondiente."""
+    if len(answer) == 1 and answer.upper() in LETTERS and answer not in options:
+        i = LETTERS.index(answer.upper())
+        if i < len(options):
+            return options[i]
+    return answer
+
+
+def grade_item(item, answers):
+    """Corrige las respuestas de un ítem (una por hueco; las que falten cuentan como vacías)."""
+    answers = list(answers)[:item.n_gaps]
+    answers += [""] * (item.n_gaps - len(answers))
+    given = [normalize(item.part, a) for a in answers]
+    if item.part == "p1":
+        given = [_resolve_letter(opts, a) for opts, a in zip(item.options, given)] + given[len(item.options):]
+    table = answer_table(item)
+    expected = tuple(" / ".join(item.accepted(g)) for g in range(item.n_gaps))
+    return Grade(item.id, tuple(given), expected, tuple(g in ok for g, ok in zip(given, table)))
+
+
+# ==============================================================================
+# 3. CORRECCIÓN EN LOTE (VECTORIZADA)
+# ==============================================================================
+def normalize_series(part, s):
+    """`normalize` sobre una Serie de pandas entera (una llamada por valor distinto)."""
+    s = s.fillna("").astype(str)
+    uniques = s.unique()
+    return s.map(dict(zip(uniques, (normalize(part, u) for u in uniques))))
+
+
+def _lookup(bank):
+    """id -> ítem, más los títulos que no se repiten en el banco."""
+    titles = {}
+    for item in bank.items:
+        titles[item.title] = None if item.title in titles else item
+    return {**{t: i for t, i in titles.items() if i is not None}, **{item.id: item for item in bank.items}}
+
+
+def grade_frame(bank, sheets, lookup=None):
+    """Corrige un DataFrame de hojas (Student, Item, Answers).
+
+    Devuelve las mismas filas con Item resuelto al id y las columnas Score, Total,
+    Correct (1/0 por hueco, separados por |) y Status.
+    """
+    import pandas as pd
+
+    part = bank.part
+    lookup = lookup if lookup is not None else _lookup(bank)
+    sheets = sheets.reset_index(drop=True)
+    answers_col = "Answers" if "Answers" in sheets.columns else "Answer"
+    items = sheets["Item"].fillna("").astype(str).str.strip().map(lambda k: lookup.get(k))
+    known = items.notna()
+    if not known.any():
+        # Ningún ítem conocido en el trozo: las tablas de abajo saldrían vacías (y sin tipo)
+        return sheets.assign(Score=0, Total=0, Correct="", Status="unknown item")
+
+    # Respuestas esperadas: una fila por (hoja, hueco) y la tabla de formas aceptadas
+    used = {item.id: item for item in items[known]}
+    key = pd.DataFrame(
+        [(item_id, g) for item_id, item in used.items() for g in range(item.n_gaps)], columns=["item_id", "gap"])
+    accepted = pd.DataFrame(
+        [(item_id, g, form) for item_id, item in used.items() for g, forms in enumerate(answer_table(item))
+         for form in forms], columns=["item_id", "gap", "given"]).assign(ok=1)
+    if part == "p1":
+        key[list(LETTERS)] = pd.DataFrame(
+            [(list(item.options[g]) + [""] * 4)[:4] if g < len(item.options) else [""] * 4
+             for item in used.values() for g in range(item.n_gaps)], columns=list(LETTERS))
+    expected = pd.DataFrame({"row": sheets.index[known], "item_id": [i.id for i in items[known]]}).merge(key, on="item_id")
+
+    # Respuestas dadas: una fila por (hoja, hueco)
+    given = sheets.loc[known, answers_col].fillna("").astype(str)
+    given = (given.str.split(SEPARATOR) if part != "p3" else given.map(lambda a: [a])).explode()
+    given = pd.DataFrame({"row": given.index, "given": given.values})
+    given["gap"] = given.groupby("row").cumcount()
+
+    long = expected.merge(given, on=["row", "gap"], how="left")
+    long["given"] = normalize_series(part, long["given"])
+    if part == "p1":
+        letter = long["given"].str.upper()
+        is_letter = (long["given"].str.len() == 1) & letter.isin(list(LETTERS))
+        is_letter &= ~long[list(LETTERS)].eq(long["given"], axis=0).any(axis=1)
+        for col in LETTERS:
+            long["given"] = long["given"].mask(is_letter & (letter == col) & long[col].ne(""), long[col])
+    long = long.merge(accepted, on=["item_id", "gap", "given"], how="left")
+    long["ok"] = long["ok"].fillna(0).astype(int)
+
+    long = long.sort_values(["row", "gap"])
+    by_row = long.groupby("row")["ok"]
+    per_row = pd.DataFrame({"Score": by_row.sum(), "Total": by_row.size(),
+                            "Correct": (long["ok"].astype(str) + SEPARATOR).groupby(long["row"]).sum().str[:-1]})
+    out = sheets.copy()
+    out["Item"] = [i.id if i is not None else k for i, k in zip(items, sheets["Item"])]
+    out = out.join(per_row)
+    out["Score"] = out["Score"].fillna(0).astype(int)
+    out["Total"] = out["Total"].fillna(0).astype(int)
+    out["Correct"] = out["Correct"].fillna("")
+    out["Status"] = known.map({True: "ok", False: "unknown item"})
+    return out
+
+
+# --- Reparto entre procesos ---
+_worker = {}
+
+
+def _init_worker(part, directory):
+    bank = get_bank(part, directory)
+    if bank is None:
+        raise RuntimeError(f"Could not load the {part} bank")
+    _worker.update(bank=bank, lookup=_lookup(bank))
+
+
+def _grade_chunk(chunk):
+    return grade_frame(_worker["bank"], chunk, _worker["lookup"])
+
+
+def grade_file(part, sheets_path, out_path=None, directory=None, processes=None, chunksize=5000):
+    """Corrige un CSV de hojas por trozos y escribe los resultados a medida que llegan.
+
+    Devuelve (hojas, hojas sin ítem conocido, aciertos, huecos).
+    """
+    import pandas as pd
+
+    reader = pd.read_csv(sheets_path, dtype=str, keep_default_na=False, chunksize=chunksize,
+                         encoding="utf-8-sig")
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        _init_worker(part, directory)
+        pool, results = None, map(_grade_chunk, reader)
+    else:
+        pool = ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(part, directory))
+        # Solo unos pocos trozos en vuelo: el CSV se lee a medida que se escriben resultados
+        results = bounded_map(pool, _grade_chunk, reader, processes * 2)
+
+    n = unknown = score = total = 0
+    try:
+        for i, result in enumerate(results):
+            if out_path:
+                result.to_csv(out_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            n += len(result)
+            unknown += int((result["Status"] != "ok").sum())
+            score += int(result["Score"].sum())
+            total += int(result["Total"].sum())
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+    return n, unknown, score, total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--part", required=True, choices=sorted(BANK_SPECS))
+    parser.add_argument("--sheets", required=True, help="CSV with Student,Item,Answers")
+    parser.add_argument("--out", default=None, help="where to write the graded rows (CSV)")
+    parser.add_argument("--data-dir", default=None, help="folder with the banks (default: FCE_DATA_DIR or .)")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunksize", type=int, default=5000, help="answer sheets per chunk")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    n, unknown, score, total = grade_file(args.part, args.sheets, args.out, args.data_dir,
+                                          args.processes, args.chunksize)
+    elapsed = time.perf_counter() - t0
+    accuracy = score / total if total else 0.0
+    print(f"{n} sheet(s) graded in {elapsed:.2f}s ({n / elapsed if elapsed else 0:.0f}/s)")
+    print(f"{score}/{total} gaps correct ({accuracy:.1%}), {unknown} sheet(s) with an unknown item")
+    return 1 if unknown else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
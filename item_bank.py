@@ -0,0 +1,504 @@
+"""Banco de ítems compilado y compartido entre todas las sesiones.
+
+Streamlit re-ejecuta app.py en cada interacción, pero los módulos importados
+viven mientras viva el proceso. Aquí parseamos cada CSV una sola vez y
+guardamos los ítems ya preparados (respuestas y opciones separadas, número de
+huecos calculado). El caché se invalida cuando cambia el mtime/tamaño del
+archivo; si el contenido (hash) es el mismo, se reutiliza el banco anterior.
+
+Si existe un banco binario compilado (`.fceb`, generado con bank_compiler.py)
+al menos tan reciente como su CSV, se carga ese archivo con mmap en lugar de
+parsear el CSV: los ítems se decodifican bajo demanda.
+
+Con el recargador (bank_reloader.py) en marcha, las versiones nuevas se
+publican desde un hilo aparte y get_bank ni siquiera consulta el disco. Los
+ítems que una recarga edita o borra se conservan aparte para que find_item
+encuentre los de una sesión que empezó antes de la recarga.
+
+En modo réplicas (FCE_SHARED_DIR, ver shared_volume.py) los .fceb viven en la
+carpeta compartida: la primera réplica que necesita un banco lo compila y todas
+lo abren con mmap, así que comparten los mismos ítems y versiones.
+"""
+import bisect
+import csv
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from dataclasses import asdict, dataclass
+
+from shared_volume import file_lock, shared_dir
+
+# ==============================================================================
+# 1. DEFINICIÓN DE LOS BANCOS
+# ==============================================================================
+# Parte -> (archivo CSV, columnas obligatorias)
+BANK_SPECS = {
+    "p1": ("fce_part1.csv", ["Text", "Answers", "Options"]),
+    "p2": ("fce_open_cloze.csv", ["Text", "Answers"]),
+    "p3": ("fce_data.csv", ["Root", "Sentence", "Answer"]),
+}
+
+
+# Dentro de un hueco, las respuestas alternativas válidas van separadas por "/"
+ALT_SEP = "/"
+
+
+def alternatives(answer):
+    """Respuestas aceptadas de un hueco, la principal primero ("which/that" -> ("which", "that"))."""
+    alts = tuple(a.strip() for a in answer.split(ALT_SEP) if a.strip())
+    return alts or (answer.strip(),)
+
+
+@dataclass(frozen=True)
+class Item:
+    """Un ejercicio inmutable. En Part 3 `text` es la frase y `root` la palabra raíz."""
+    id: str
+    part: str
+    title: str
+    text: str
+    answers: tuple
+    options: tuple = ()
+    url: str = ""
+    root: str = ""
+
+    @property
+    def n_gaps(self):
+        return len(self.answers)
+
+    def accepted(self, gap):
+        """Respuestas aceptadas en el hueco `gap` (empezando en 0)."""
+        return alternatives(self.answers[gap])
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data["answers"] = tuple(data.get("answers", ()))
+        data["options"] = tuple(tuple(o) for o in data.get("options", ()))
+        return cls(**data)
+
+
+class Bank:
+    """Colección de ítems de una parte, con índice id -> posición."""
+    __slots__ = ("part", "filename", "version", "items", "index")
+
+    def __init__(self, part, filename, version, items):
+        self.part = part
+        self.filename = filename
+        self.version = version
+        self.items = tuple(items)
+        self.index = {item.id: i for i, item in enumerate(self.items)}
+
+    def __len__(self):
+        return len(self.items)
+
+    def ids(self):
+        return self.index.keys()
+
+    def get(self, item_id):
+        pos = self.index.get(item_id)
+        return None if pos is None else self.items[pos]
+
+
+# ==============================================================================
+# 2. COMPILACIÓN (CSV -> ÍTEMS)
+# ==============================================================================
+def _clean(value):
+    if value is None or (isinstance(value, float) and value != value):  # None o NaN
+        return ""
+    return str(value).strip()
+
+
+def _item_id(part, *fields):
+    digest = hashlib.blake2b("\x1f".join(fields).encode("utf-8"), digest_size=6).hexdigest()
+    return f"{part}-{digest}"
+
+
+def compile_row(part, row):
+    """Convierte una fila (dict) del CSV en un Item."""
+    if part == "p3":
+        root, sentence, answer = _clean(row["Root"]), _clean(row["Sentence"]), _clean(row["Answer"])
+        return Item(id=_item_id(part, root, sentence, answer), part=part, title=root,
+                    text=sentence, answers=(answer,), root=root)
+
+    title, text = _clean(row.get("Title")), _clean(row["Text"])
+    answers = tuple(a.strip() for a in _clean(row["Answers"]).split("|"))
+    options = ()
+    if part == "p1":
+        options = tuple(tuple(o.strip() for o in group.split("/"))
+                        for group in _clean(row["Options"]).split("|"))
+    # El id cubre todo lo que ve y contesta el alumno: corregir una respuesta crea otro ítem
+    return Item(id=_item_id(part, title, text, _clean(row["Answers"]), _clean(row.get("Options")),
+                            _clean(row.get("URL"))),
+                part=part, title=title, text=text, answers=answers, options=options, url=_clean(row.get("URL")))
+
+
+def compile_rows(part, rows):
+    """Compila filas (dicts) en ítems; los ids repetidos reciben un sufijo."""
+    items, seen = [], {}
+    for row in rows:
+        item = compile_row(part, row)
+        n = seen.get(item.id, 0)
+        seen[item.id] = n + 1
+        if n:
+            item = Item(**{**item.to_dict(), "id": f"{item.id}-{n}"})
+        items.append(item)
+    return items
+
+
+def check_row(header, row, required_cols):
+    """Filtro de filas común a la carga, la recarga en caliente y el compilador.
+
+    Devuelve (dict_fila, motivo). Sin dict la fila se descarta y `motivo` dice por
+    qué (vacía, cabecera repetida, campos de más, campo obligatorio vacío). Con
+    dict y motivo la fila vale, pero le faltaban campos al final y se rellenaron.
+    """
+    if not any(cell.strip() for cell in row):
+        return None, "empty line"
+    if row == header:
+        return None, "repeated header row"
+    if len(row) > len(header):
+        return None, f"expected {len(header)} fields, found {len(row)}"
+    note = None
+    if len(row) < len(header):
+        note = f"expected {len(header)} fields, found {len(row)} (missing ones left empty)"
+        row = row + [""] * (len(header) - len(row))
+    record = dict(zip(header, row))
+    empty = [c for c in required_cols if not record[c].strip()]
+    if empty:
+        return None, f"empty required field(s): {', '.join(empty)}"
+    return record, note
+
+
+def _read_rows(path, required_cols):
+    """Filas del CSV como dicts, con el módulo csv (sin pandas), filtradas con check_row."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f, quotechar='"')
+        header = next(reader, [])
+        missing = [c for c in required_cols if c not in header]
+        if missing:
+            raise ValueError(f"missing column(s): {', '.join(missing)}")
+        for row in reader:
+            record, _ = check_row(header, row, required_cols)
+            if record is not None:
+                yield record
+
+
+def _read_bank(part, path, version):
+    _, required_cols = BANK_SPECS[part]
+    return Bank(part, path, version, compile_rows(part, _read_rows(path, required_cols)))
+
+
+# ==============================================================================
+# 3. CACHÉ COMPARTIDO
+# ==============================================================================
+_cache = {}  # ruta -> (firma (mtime_ns, size), Bank)
+_lock = threading.Lock()
+# Bancos publicados por el recargador (bank_reloader.py): (parte, carpeta) -> Bank.
+# Si hay uno, get_bank lo devuelve sin tocar el disco.
+_live = {}
+# Ítems que ya no están en el banco instalado (editados o borrados): una sesión que
+# empezó con una versión anterior sigue encontrando los suyos aunque haya habido muchas
+# recargas. Solo se guardan los ítems que cambiaron, no bancos enteros.
+_current = {}  # parte -> último Bank instalado
+_retired = {}  # parte -> {id: Item}
+
+
+def _file_hash(path):
+    h = hashlib.blake2b(digest_size=12)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def data_dir():
+    """Carpeta de los CSV (FCE_DATA_DIR, por defecto el directorio actual)."""
+    return os.environ.get("FCE_DATA_DIR", ".")
+
+
+def compiled_path(csv_path):
+    """.fceb de un CSV: junto a él o, en modo réplicas, en la carpeta compartida."""
+    name = os.path.splitext(csv_path)[0] + ".fceb"
+    directory = shared_dir()
+    return name if directory is None else os.path.join(directory, os.path.basename(name))
+
+
+def _pick_source(csv_path):
+    """Elige el .fceb si existe y no es más antiguo que el CSV; si no, el CSV."""
+    fceb = compiled_path(csv_path)
+    try:
+        fceb_mtime = os.stat(fceb).st_mtime_ns
+    except OSError:
+        return csv_path
+    try:
+        if os.stat(csv_path).st_mtime_ns > fceb_mtime:
+            return csv_path
+    except OSError:
+        pass
+    return fceb
+
+
+def compile_shared(part, csv_path):
+    """Modo réplicas: compila el CSV a su .fceb compartido y devuelve la ruta del .fceb.
+
+    Una sola réplica compila (con el cerrojo cogido); las que llegan a la vez esperan
+    y se encuentran el archivo ya hecho. El .fceb se instala con os.replace: quien
+    tenga abierto (mmap) el anterior lo sigue leyendo entero.
+    """
+    from bank_compiler import compile_bank  # bank_compiler importa este módulo
+
+    fceb = compiled_path(csv_path)
+    with file_lock(fceb + ".lock"):
+        if _pick_source(csv_path) == fceb:  # Otra réplica lo compiló mientras esperábamos
+            return fceb
+        # El .fceb lleva el mtime del CSV que se leyó: si el CSV cambia durante la compilación
+        # seguirá siendo más nuevo y se volverá a compilar
+        csv_mtime = os.stat(csv_path).st_mtime_ns
+        tmp = fceb + ".new"
+        n_ok, _, _ = compile_bank(part, csv_path, tmp, report=lambda issue: None)
+        if not n_ok:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise ValueError(f"{csv_path}: no valid rows")
+        os.utime(tmp, ns=(csv_mtime, csv_mtime))
+        os.replace(tmp, fceb)
+    print(f"Banco {part} compilado en {fceb} ({n_ok} ítems)")
+    return fceb
+
+
+def _remember(part, bank):
+    """Instala `bank` como versión actual y retira los ítems de la anterior que ya no están."""
+    previous = _current.get(part)
+    _current[part] = bank
+    if previous is None or previous is bank or previous.version == bank.version:
+        return
+    current = set(bank.ids())
+    retired = _retired.setdefault(part, {})
+    for item_id in [i for i in retired if i in current]:  # Volvió a la versión actual
+        del retired[item_id]
+    for item_id in previous.ids():
+        if item_id not in current and item_id not in retired:
+            retired[item_id] = previous.get(item_id)
+
+
+def publish(part, directory, path, signature, bank):
+    """Instala una versión del banco de forma atómica: quien ya tenía la anterior la conserva."""
+    with _lock:
+        _remember(part, bank)
+        _cache[path] = (signature, bank)
+        _live[(part, os.path.abspath(directory or data_dir()))] = bank
+
+
+def find_item(bank, item_id):
+    """Ítem por id en el banco actual o, si se recargó a mitad de un ejercicio, entre los retirados.
+
+    Los ids son un hash de todo el contenido (texto, respuestas, opciones): el ítem
+    encontrado es exactamente el que vio el alumno.
+    """
+    item = bank.get(item_id)
+    if item is None:
+        item = _retired.get(bank.part, {}).get(item_id)
+    return item
+
+
+def get_bank(part, directory=None):
+    """Devuelve el banco compilado de la parte, o None si el CSV no existe o no se puede leer.
+
+    Con el recargador en marcha es una consulta a un dict. Sin él, el camino rápido
+    (sin cambios en disco) es un os.stat y una consulta a un dict; en ambos casos,
+    independiente del tamaño del banco.
+    """
+    live = _live.get((part, os.path.abspath(directory or data_dir())))
+    if live is not None:
+        return live
+    path = _pick_source(os.path.join(directory or data_dir(), BANK_SPECS[part][0]))
+    try:
+        st_ = os.stat(path)
+    except OSError:
+        return None
+    signature = (st_.st_mtime_ns, st_.st_size)
+
+    cached = _cache.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    with _lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        try:
+            if not path.endswith(".fceb") and shared_dir():
+                path = compile_shared(part, path)
+                st_ = os.stat(path)
+                signature = (st_.st_mtime_ns, st_.st_size)
+            if path.endswith(".fceb"):
+                bank = MappedBank.open(path)
+            else:
+                version = _file_hash(path)
+                if cached and cached[1].version == version:
+                    bank = cached[1]  # Solo cambió el mtime (touch): el contenido es el mismo
+                else:
+                    bank = _read_bank(part, path, version)
+        except Exception as e:
+            print(f"Error cargando banco {path}: {e}")
+            return None
+        _remember(part, bank)
+        _cache[path] = (signature, bank)
+        return bank
+
+
+# ==============================================================================
+# 4. BANCO BINARIO COMPILADO (.fceb)
+# ==============================================================================
+# Cabecera (80 bytes) | registros JSON comprimidos con zlib | offsets (count+1 x u64) | índice de ids
+# El índice de ids está ordenado (id de 32 bytes + posición u64) y se consulta con
+# búsqueda binaria directamente sobre el mmap, sin cargarlo en memoria.
+MAGIC = b"FCEBANK1"
+_HEADER = struct.Struct("<8s4s4xQQQQ32s")
+_OFFSET = struct.Struct("<Q")
+_ID_ENTRY = struct.Struct("<32sQ")
+
+
+def _encode_item(item):
+    raw = json.dumps([item.id, item.title, item.text, item.answers, item.options, item.url, item.root],
+                     ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return zlib.compress(raw, 6)
+
+
+def _decode_item(part, raw):
+    id_, title, text, answers, options, url, root = json.loads(zlib.decompress(raw))
+    return Item(id=id_, part=part, title=title, text=text, answers=tuple(answers),
+                options=tuple(tuple(o) for o in options), url=url, root=root)
+
+
+class BankWriter:
+    """Escribe un .fceb en streaming: los registros van directos al disco y en
+    memoria solo quedan los offsets y los ids (necesarios para el índice)."""
+
+    def __init__(self, path, part):
+        self.path = path
+        self.part = part
+        self._tmp = f"{path}.tmp"
+        self._f = open(self._tmp, "wb")
+        self._f.write(b"\0" * _HEADER.size)
+        self._offsets = [_HEADER.size]
+        self._ids = []
+        self._hash = hashlib.blake2b(digest_size=12)
+
+    def add(self, item):
+        raw = _encode_item(item)
+        if len(item.id.encode("utf-8")) > 32:
+            raise ValueError(f"Item id too long for the index: {item.id}")
+        self._f.write(raw)
+        self._hash.update(raw)
+        self._ids.append(item.id)
+        self._offsets.append(self._offsets[-1] + len(raw))
+
+    def close(self):
+        """Escribe offsets, índice y cabecera, y sustituye el archivo de forma atómica."""
+        f = self._f
+        offsets_pos = self._offsets[-1]
+        for off in self._offsets:
+            f.write(_OFFSET.pack(off))
+        ids_pos = f.tell()
+        for id_, pos in sorted((id_.encode("utf-8"), pos) for pos, id_ in enumerate(self._ids)):
+            f.write(_ID_ENTRY.pack(id_, pos))
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, self.part.encode("ascii"), len(self._ids), _HEADER.size,
+                             offsets_pos, ids_pos, self._hash.hexdigest().encode("ascii")))
+        f.close()
+        os.replace(self._tmp, self.path)
+        return self._hash.hexdigest()
+
+    def abort(self):
+        self._f.close()
+        os.remove(self._tmp)
+
+
+class _MappedItems:
+    """Secuencia de solo lectura que decodifica cada ítem del mmap al pedirlo."""
+    __slots__ = ("_bank",)
+
+    def __init__(self, bank):
+        self._bank = bank
+
+    def __len__(self):
+        return self._bank.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._bank.count))]
+        return self._bank.item_at(i)
+
+    def __iter__(self):
+        for i in range(self._bank.count):
+            yield self._bank.item_at(i)
+
+
+class _IdKeys:
+    """Vista de las claves del índice de ids para usar bisect sobre el mmap."""
+    __slots__ = ("_bank",)
+
+    def __init__(self, bank):
+        self._bank = bank
+
+    def __len__(self):
+        return self._bank.count
+
+    def __getitem__(self, k):
+        return self._bank.id_entry(k)[0]
+
+
+class MappedBank:
+    """Banco leído de un .fceb con mmap. Misma interfaz que Bank (part, version, items, get)."""
+
+    def __init__(self, path, mm):
+        magic, part, count, records_pos, offsets_pos, ids_pos, version = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a compiled FCE bank")
+        self.filename = path
+        self.part = part.rstrip(b"\0").decode("ascii")
+        self.version = version.rstrip(b"\0").decode("ascii")
+        self.count = count
+        self._mm = mm
+        self._offsets_pos = offsets_pos
+        self._ids_pos = ids_pos
+        self.items = _MappedItems(self)
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(path, mm)
+
+    def __len__(self):
+        return self.count
+
+    def item_at(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        start, end = struct.unpack_from("<QQ", self._mm, self._offsets_pos + 8 * i)
+        return _decode_item(self.part, self._mm[start:end])
+
+    def id_entry(self, k):
+        id_, pos = _ID_ENTRY.unpack_from(self._mm, self._ids_pos + _ID_ENTRY.size * k)
+        return id_.rstrip(b"\0"), pos
+
+    def ids(self):
+        return (self.id_entry(k)[0].decode("utf-8") for k in range(self.count))
+
+    def get(self, item_id):
+        key = item_id.encode("utf-8")
+        k = bisect.bisect_left(_IdKeys(self), key)
+        if k < self.count:
+            found, pos = self.id_entry(k)
+            if found == key:
+                return self.item_at(pos)
+        return None
@@ -0,0 +1,169 @@
+"""Instrumentación ligera de cada rerun (tiempos por etapa).
+
+Uso en la app:
+
+    with metrics.rerun(enabled=debug, on_done=callback):   # envuelve el rerun completo
+        ...
+        with metrics.span("load_data"):
+            ...
+
+Si la medición está apagada (ni FCE_METRICS=1 ni ?debug=1), `span()` devuelve un
+contexto vacío compartido y el coste es una consulta a un thread-local.
+Los agregados (contadores e histogramas por etapa) se exportan en formato de
+texto Prometheus o como JSON; con FCE_METRICS_FILE se vuelcan periódicamente
+a ese archivo (.json o .prom según la extensión).
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+from time import perf_counter
+
+ENABLED = os.environ.get("FCE_METRICS") == "1"
+EXPORT_FILE = os.environ.get("FCE_METRICS_FILE")
+EXPORT_INTERVAL = 15  # segundos entre volcados a EXPORT_FILE
+
+# Límites de los buckets del histograma, en segundos
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+# ==============================================================================
+# 1. REGISTRO GLOBAL (compartido por todas las sesiones del proceso)
+# ==============================================================================
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # el último es +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        i = 0
+        while i < len(BUCKETS) and seconds > BUCKETS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.total += seconds
+        self.count += 1
+
+
+class Registry:
+    def __init__(self):
+        self.histograms = {}
+        self.reruns = 0
+        self._lock = threading.Lock()
+        self._last_export = 0.0
+
+    def record(self, spans):
+        with self._lock:
+            self.reruns += 1
+            for stage, seconds in spans.items():
+                hist = self.histograms.get(stage)
+                if hist is None:
+                    hist = self.histograms[stage] = Histogram()
+                hist.observe(seconds)
+
+    def snapshot(self):
+        """Estado agregado como dict serializable a JSON."""
+        with self._lock:
+            return {
+                "reruns": self.reruns,
+                "stages": {
+                    stage: {
+                        "count": h.count,
+                        "sum_s": round(h.total, 6),
+                        "mean_ms": round(h.total / h.count * 1000, 3) if h.count else 0.0,
+                        "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], h.counts)),
+                    }
+                    for stage, h in sorted(self.histograms.items())
+                },
+            }
+
+    def prometheus(self):
+        """Agregados en formato de texto de Prometheus."""
+        lines = [
+            "# HELP fce_reruns_total Instrumented script reruns.",
+            "# TYPE fce_reruns_total counter",
+            f"fce_reruns_total {self.reruns}",
+            "# HELP fce_stage_seconds Time spent per rerun stage.",
+            "# TYPE fce_stage_seconds histogram",
+        ]
+        with self._lock:
+            for stage, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for le, n in zip([str(b) for b in BUCKETS] + ["+Inf"], h.counts):
+                    cumulative += n
+                    lines.append(f'fce_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'fce_stage_seconds_sum{{stage="{stage}"}} {h.total:.6f}')
+                lines.append(f'fce_stage_seconds_count{{stage="{stage}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Escribe los agregados en `path` de forma atómica (.json -> JSON, otro -> Prometheus)."""
+        data = json.dumps(self.snapshot(), indent=2) if path.endswith(".json") else self.prometheus()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def maybe_export(self):
+        if not EXPORT_FILE or time.time() - self._last_export < EXPORT_INTERVAL:
+            return
+        self._last_export = time.time()
+        try:
+            self.export(EXPORT_FILE)
+        except OSError as e:
+            print(f"Error exportando métricas: {e}")
+
+
+registry = Registry()
+
+
+# ==============================================================================
+# 2. SPANS POR RERUN
+# ==============================================================================
+_local = threading.local()
+_NULL = contextlib.nullcontext()
+
+
+class _Span:
+    __slots__ = ("name", "spans", "t0")
+
+    def __init__(self, name, spans):
+        self.name = name
+        self.spans = spans
+
+    def __enter__(self):
+        self.t0 = perf_counter()
+
+    def __exit__(self, *exc):
+        self.spans[self.name] = self.spans.get(self.name, 0.0) + perf_counter() - self.t0
+
+
+def span(name):
+    """Mide el bloque como etapa `name` del rerun actual (no hace nada si está apagado)."""
+    spans = getattr(_local, "spans", None)
+    if spans is None:
+        return _NULL
+    return _Span(name, spans)
+
+
+@contextlib.contextmanager
+def rerun(enabled=False, on_done=None):
+    """Envuelve un rerun completo. Al terminar (también con st.rerun/st.stop) agrega
+    los tiempos y llama a `on_done(spans)` con el desglose en segundos."""
+    if not (ENABLED or enabled):
+        yield
+        return
+    spans = _local.spans = {}
+    t0 = perf_counter()
+    try:
+        yield
+    finally:
+        spans["rerun"] = perf_counter() - t0
+        _local.spans = None
+        registry.record(spans)
+        registry.maybe_export()
+        if on_done:
+            on_done(spans)
@@ -0,0 +1,156 @@
+"""Paquetes de examen completo (Parts 1-3) preparados de antemano.
+
+Un paquete es un texto de Part 1, uno de Part 2 y N preguntas de Part 3. Un
+hilo en segundo plano mantiene una reserva de paquetes listos para cada
+combinación de versiones de los bancos; empezar un simulacro es sacar el
+primero de la cola (O(1)), sin muestrear nada durante el rerun.
+
+Los paquetes se montan con una baraja por parte compartida por todo el proceso
+(sampler.Deck): paquetes consecutivos no repiten ítems hasta agotar el banco,
+así que los simulacros se reparten por todo el banco. En Part 3 cada pregunta
+es de una familia distinta y ninguna categoría (sustantivo, adverbio...) ocupa
+más de la mitad del paquete.
+"""
+import collections
+import itertools
+import math
+import threading
+
+from item_bank import get_bank
+from sampler import Deck
+from word_families import analyze
+
+P3_QUESTIONS = 8
+POOL_SIZE = 16
+LOW_WATER = 4
+
+
+class Pack:
+    __slots__ = ("id", "versions", "p1", "p2", "p3")
+
+    def __init__(self, pack_id, versions, p1, p2, p3):
+        self.id = pack_id
+        self.versions = versions  # {parte: versión del banco}
+        self.p1 = p1              # id de ítem
+        self.p2 = p2              # id de ítem
+        self.p3 = p3              # tupla de ids
+
+    def to_dict(self):
+        return {"id": self.id, "versions": self.versions, "p1": self.p1, "p2": self.p2, "p3": list(self.p3)}
+
+
+class PackPool:
+    def __init__(self, size=POOL_SIZE, low_water=LOW_WATER, p3_questions=P3_QUESTIONS, directory=None):
+        self.size = size
+        self.low_water = low_water
+        self.p3_questions = p3_questions
+        self.directory = directory
+        self._ready = collections.deque()
+        self._versions = None
+        self._decks = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    # --- API ---
+    def warm(self):
+        """Arranca (si hace falta) el hilo que rellena la reserva."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._refill_loop, name="fce-mock-packs", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def checkout(self):
+        """Saca un paquete listo; si la reserva está vacía (arranque en frío) monta uno al momento."""
+        self.warm()
+        banks = self._banks()
+        if banks is None:
+            return None
+        versions = {p: b.version for p, b in banks.items()}
+        with self._lock:
+            if versions == self._versions and self._ready:
+                pack = self._ready.popleft()
+                if len(self._ready) < self.low_water:
+                    self._wake.set()
+                return pack
+        return self._assemble(banks)
+
+    def __len__(self):
+        return len(self._ready)
+
+    # --- Montaje ---
+    def _banks(self):
+        banks = {p: get_bank(p, self.directory) for p in ("p1", "p2", "p3")}
+        if any(b is None or len(b) == 0 for b in banks.values()):
+            return None
+        return banks
+
+    def _draw(self, bank, n=1):
+        deck = self._decks.get(bank.part)
+        if deck is None or deck.version != bank.version or deck.size != len(bank):
+            deck = self._decks[bank.part] = Deck(len(bank), bank.version)
+        return [bank.items[i] for i in deck.draw(n)]
+
+    def _pick_p3(self, bank):
+        n = min(self.p3_questions, len(bank))
+        max_per_class = math.ceil(n / 2)
+        chosen, roots, classes = [], set(), collections.Counter()
+        # Se prueban cartas de la baraja; las que no encajan se descartan (volverán a salir en otra vuelta)
+        for _ in range(n * 6):
+            if len(chosen) == n:
+                break
+            item = self._draw(bank)[0]
+            word_class = analyze(item.root or item.title, item.accepted(0)[0])[2]
+            if item.root in roots or classes[word_class] >= max_per_class or item in chosen:
+                continue
+            chosen.append(item)
+            roots.add(item.root)
+            classes[word_class] += 1
+        while len(chosen) < n:  # Banco poco variado: se completa sin las restricciones
+            item = self._draw(bank)[0]
+            if item not in chosen:
+                chosen.append(item)
+        return tuple(item.id for item in chosen)
+
+    def _assemble(self, banks):
+        with self._lock:
+            return Pack(next(self._ids), {p: b.version for p, b in banks.items()},
+                        self._draw(banks["p1"])[0].id, self._draw(banks["p2"])[0].id, self._pick_p3(banks["p3"]))
+
+    def _refill_loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                banks = self._banks()
+                if banks is None:
+                    continue
+                versions = {p: b.version for p, b in banks.items()}
+                with self._lock:
+                    if versions != self._versions:  # Cambió algún banco: los paquetes viejos no sirven
+                        self._ready.clear()
+                        self._versions = versions
+                while len(self._ready) < self.size:
+                    pack = self._assemble(banks)
+                    with self._lock:
+                        if self._versions != pack.versions:
+                            break
+                        self._ready.append(pack)
+            except Exception as e:
+                print(f"Error preparando simulacros: {e}")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pack_pool():
+    """Reserva de paquetes compartida por todo el proceso."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PackPool()
+    return _pool
@@ -0,0 +1,19 @@
+"""Reparto de trabajo entre procesos para las herramientas de línea de comandos.
+
+Executor.map envía todas las tareas de golpe: con un lector en streaming (trozos
+de un CSV, lotes de un corpus) leería y serializaría el archivo entero antes de
+devolver el primer resultado. bounded_map mantiene solo una ventana de tareas
+en vuelo, así la memoria no depende del tamaño de la entrada.
+"""
+import collections
+
+
+def bounded_map(pool, fn, iterable, window):
+    """Como pool.map (mismo orden), pero sin leer más de `window` elementos por delante de lo ya devuelto."""
+    pending = collections.deque()
+    for item in iterable:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
@@ -0,0 +1,78 @@
+"""Plantillas de huecos para los textos cloze (Part 1 y Part 2).
+
+Cada texto se tokeniza una sola vez con una regex: los trozos de texto fijo y
+los huecos `_n_` quedan separados, y pintar la versión en blanco o la
+corregida es solo rellenar huecos y hacer un join. El HTML resultante se
+memoriza por ítem y vista.
+"""
+import re
+from functools import lru_cache
+
+GAP_RE = re.compile(r"_(\d+)_")
+
+BLANK_GAP = "<span class='gap-highlight'>({n}) .......</span>"
+CORRECT_GAP = "<span class='gap-correct'>{answer}</span>"
+
+
+class GapTemplate:
+    """Texto troceado: segments[k] va antes de gaps[k]; el último segmento cierra el texto."""
+    __slots__ = ("segments", "gaps", "problems")
+
+    def __init__(self, segments, gaps, problems):
+        self.segments = segments
+        self.gaps = gaps
+        self.problems = problems
+
+    def fill(self, slots):
+        """Intercala los segmentos con los valores de `slots` (uno por hueco)."""
+        parts = []
+        for seg, value in zip(self.segments, slots):
+            parts.append(seg)
+            parts.append(value)
+        parts.append(self.segments[-1])
+        return "".join(parts)
+
+
+@lru_cache(maxsize=8192)
+def compile_template(text, n_answers):
+    """Tokeniza `text` y comprueba que los huecos sean exactamente _1_ ... _n_.
+
+    Los marcadores fuera de rango se dejan como texto literal (igual que antes)
+    y se anotan en `problems`.
+    """
+    segments, gaps, problems = [], [], []
+    pos = 0
+    for m in GAP_RE.finditer(text):
+        n = int(m.group(1))
+        if not 1 <= n <= n_answers:
+            problems.append(f"marker _{n}_ has no answer")
+            continue
+        segments.append(text[pos:m.start()])
+        gaps.append(n)
+        pos = m.end()
+    segments.append(text[pos:])
+
+    seen = set(gaps)
+    if len(seen) != len(gaps):
+        problems.append("duplicated gap markers")
+    missing = [n for n in range(1, n_answers + 1) if n not in seen]
+    if missing:
+        problems.append("missing gap markers: " + ", ".join(f"_{n}_" for n in missing))
+    return GapTemplate(tuple(segments), tuple(gaps), tuple(problems))
+
+
+def template_for(item):
+    return compile_template(item.text, item.n_gaps)
+
+
+@lru_cache(maxsize=4096)
+def render_item(item, view):
+    """HTML del texto de un ítem. `view` es "blank" (huecos numerados) o "corrected"."""
+    tpl = template_for(item)
+    if view == "blank":
+        slots = [BLANK_GAP.format(n=n) for n in tpl.gaps]
+    elif view == "corrected":
+        slots = [CORRECT_GAP.format(answer=item.accepted(n - 1)[0]) for n in tpl.gaps]
+    else:
+        raise ValueError(f"Unknown view: {view}")
+    return tpl.fill(slots)
@@ -0,0 +1,97 @@
+"""Muestreo sin repeticiones por sesión ("baraja" de índices).
+
+Cada sesión recorre las posiciones del banco en un orden barajado; no se repite
+ningún ítem hasta agotar el banco, y al volver a barajar las últimas cartas
+vistas quedan al fondo para no repetir justo el ejercicio anterior.
+
+La baraja no se guarda como lista: es una permutación pseudoaleatoria de
+[0, size) (una red de Feistel con "cycle walking") definida por una semilla.
+Sacar una carta es O(1) y el estado de cada sesión ocupa lo mismo con 50 ítems
+que con 100.000.
+"""
+import random
+
+
+def _permute(i, n, seed):
+    """Imagen de i en una permutación de [0, n) determinada por `seed`."""
+    bits = max(2, (n - 1).bit_length())
+    bits += bits & 1
+    half = bits // 2
+    mask = (1 << half) - 1
+    x = i
+    while True:
+        left, right = x >> half, x & mask
+        for rnd in range(4):
+            left, right = right, left ^ (hash((seed, rnd, right)) & mask)
+        x = (left << half) | right
+        if x < n:  # Si cae fuera del rango se vuelve a permutar (sigue siendo biyectiva)
+            return x
+
+
+class Deck:
+    __slots__ = ("size", "version", "_seed", "_pos", "_avoid", "_deferred", "_recent", "_rng")
+
+    def __init__(self, size, version=None, rng=None):
+        self.size = size
+        self.version = version
+        self._rng = rng or random  # el generador global: no copiamos su estado en cada sesión
+        self._seed = 0
+        self._pos = size  # Vacía: se baraja en el primer draw
+        self._avoid = frozenset()
+        self._deferred = []
+        self._recent = ()
+
+    def __len__(self):
+        """Cartas que quedan antes de volver a barajar."""
+        return self.size - self._pos + len(self._deferred)
+
+    def _reshuffle(self, avoid):
+        self._seed = self._rng.getrandbits(32)
+        self._pos = 0
+        self._avoid = frozenset(avoid)
+        self._deferred = []  # La nueva vuelta vuelve a contener todas las cartas
+
+    def _next_card(self, exclude=()):
+        """Siguiente carta que no esté en `exclude` (las ya sacadas en este draw), o None."""
+        while self._pos < self.size:
+            card = _permute(self._pos, self.size, self._seed)
+            self._pos += 1
+            if card in self._avoid:
+                # Lo recién visto va al fondo de la baraja
+                self._deferred.append(card)
+                continue
+            return card
+        for i, card in enumerate(self._deferred):
+            if card not in exclude:
+                return self._deferred.pop(i)
+        return None
+
+    def draw(self, n=1):
+        """Devuelve n posiciones distintas (si n <= size) sin repetir las ya vistas en esta vuelta."""
+        if not self.size:
+            return []
+        out, taken, reshuffled = [], set(), False
+        while len(out) < n:
+            card = self._next_card(taken)
+            if card is None:
+                # Una segunda vuelta en el mismo draw solo pasa si n > size: ahí sí se repite
+                if reshuffled and len(taken) >= self.size:
+                    taken = set()
+                self._reshuffle(set(out) | set(self._recent))
+                reshuffled = True
+                continue
+            out.append(card)
+            taken.add(card)
+        self._recent = tuple(out)
+        return out
+
+
+def draw_items(decks, bank, n=1):
+    """Saca n ítems del banco usando la baraja de `decks` (un dict de la sesión).
+
+    Si el banco cambió de versión, la baraja se rehace para el nuevo tamaño.
+    """
+    deck = decks.get(bank.part)
+    if deck is None or deck.version != bank.version or deck.size != len(bank):
+        deck = decks[bank.part] = Deck(len(bank), bank.version)
+    return [bank.items[i] for i in deck.draw(n)]
@@ -0,0 +1,152 @@
+"""Búsqueda de texto y etiquetas sobre los bancos de ítems.
+
+Por cada versión de un banco se construye una vez un índice invertido:
+
+    token -> posiciones de los ítems que lo contienen (título, texto/frase, raíz y respuestas)
+    token -> posiciones de los ítems en los que es una respuesta
+    etiqueta -> posiciones
+
+Las etiquetas se deducen del contenido: qué tipo de palabra se pregunta en los
+huecos de Part 1/2 ("prepositions", "phrasal verbs", ...) y, en Part 3, el afijo
+y la categoría del índice de familias ("-ly", "negative", "adverb").
+
+Consulta (todas las condiciones se combinan con AND):
+
+    holiday beach        palabras en cualquier campo
+    'of'  "of"  answer:of   la palabra es la respuesta de algún hueco
+    #phrasal-verbs  tag:adverb   etiqueta
+
+Una consulta es una intersección de conjuntos empezando por el más pequeño:
+milisegundos aunque el banco tenga decenas de miles de textos.
+"""
+import re
+import threading
+
+from word_families import item_keys
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+AFTER_GAP_RE = re.compile(r"_(\d+)_\W*([a-z']+)(?:\W+([a-z']+))?")
+TERM_RE = re.compile(r"""(#|tag:|answer:)?(?:'([^']+)'|"([^"]+)"|(\S+))""")
+
+# Palabras que se suelen preguntar en los huecos de Part 1/2, por tipo
+WORD_TAGS = {
+    "prepositions": {"of", "in", "on", "at", "to", "for", "with", "by", "from", "about", "into", "through",
+                     "during", "without", "under", "over", "between", "against", "among", "despite"},
+    "articles": {"a", "an", "the"},
+    "pronouns": {"it", "they", "them", "he", "she", "we", "us", "you", "one", "themselves", "itself",
+                 "himself", "herself", "ourselves", "each", "other", "there"},
+    "relative pronouns": {"which", "who", "whom", "whose", "that", "where", "when", "what"},
+    "conjunctions": {"and", "but", "or", "so", "although", "though", "because", "unless", "if", "while",
+                     "whereas", "since", "as", "than", "whether", "even", "however", "nor", "yet"},
+    "auxiliaries": {"is", "are", "was", "were", "be", "been", "being", "have", "has", "had", "do", "does",
+                    "did", "will", "would", "can", "could", "should", "must", "may", "might", "not"},
+    "quantifiers": {"all", "some", "any", "many", "much", "few", "little", "more", "most", "no", "every",
+                    "both", "either", "neither", "enough", "several", "such"},
+}
+# Palabra -> etiquetas a las que pertenece
+_WORD_TAGS = {w: {t for t, v in WORD_TAGS.items() if w in v} for vocab in WORD_TAGS.values() for w in vocab}
+PARTICLES = {"up", "down", "off", "out", "away", "back"}
+OBJECT_PRONOUNS = {"it", "them", "him", "her", "me", "us", "you", "yourself", "themselves"}
+PHRASAL = "phrasal verbs"
+
+
+def tokens(text):
+    return TOKEN_RE.findall(text.lower().replace("’", "'"))
+
+
+def tag_slug(tag):
+    return tag.replace(" ", "-")
+
+
+def _words_after_gaps(text):
+    """{n: primera palabra tras el hueco n}, saltando un pronombre objeto ("_1_ them up" -> "up")."""
+    out = {}
+    for m in AFTER_GAP_RE.finditer(text.lower()):
+        first, second = m.group(2), m.group(3)
+        out[int(m.group(1))] = second if second and first in OBJECT_PRONOUNS else first
+    return out
+
+
+def item_tags(item):
+    """Etiquetas de un ítem, deducidas de sus respuestas."""
+    if item.part == "p3":
+        return {value for kind, value in item_keys(item) if kind in ("affix", "class") and value != "other"}
+    tags = set()
+    after = _words_after_gaps(item.text) if item.part == "p1" else {}
+    for n in range(1, item.n_gaps + 1):
+        accepted = [a.lower() for a in item.accepted(n - 1)]  # Con sus alternativas ("which/that")
+        for answer in accepted:
+            tags.update(_WORD_TAGS.get(answer, ()))
+        # Phrasal verb: en Part 2 se pregunta la partícula; en Part 1, el verbo que la precede
+        if any(a in PARTICLES for a in accepted) or after.get(n) in PARTICLES:
+            tags.add(PHRASAL)
+    return tags
+
+
+# ==============================================================================
+# 1. ÍNDICE
+# ==============================================================================
+class SearchIndex:
+    def __init__(self, bank):
+        self.bank = bank
+        self.version = bank.version
+        self.words = {}    # token -> set(posiciones)
+        self.answers = {}  # token -> set(posiciones)
+        self.tags = {}     # etiqueta (con guiones) -> set(posiciones)
+        for pos, item in enumerate(bank.items):
+            answer_tokens = {t for a in item.answers for t in tokens(a)}
+            item_tag_set = {tag_slug(t) for t in item_tags(item)}
+            for t in set(tokens(item.title)) | set(tokens(item.text)) | set(tokens(item.root)) | answer_tokens:
+                self.words.setdefault(t, set()).add(pos)
+            for t in answer_tokens:
+                self.answers.setdefault(t, set()).add(pos)
+            for tag in item_tag_set:
+                self.tags.setdefault(tag, set()).add(pos)
+                # Las etiquetas también se encuentran escribiéndolas como texto ("phrasal verbs")
+                for t in tokens(tag):
+                    self.words.setdefault(t, set()).add(pos)
+
+    def tag_counts(self):
+        return sorted((tag, len(p)) for tag, p in self.tags.items())
+
+    def parse(self, query):
+        """Convierte la consulta en una lista de (índice, clave)."""
+        terms = []
+        for prefix, single, double, bare in TERM_RE.findall(query):
+            if prefix in ("#", "tag:"):
+                terms.append((self.tags, tag_slug((single or double or bare).lower())))
+            elif prefix == "answer:" or single or double:
+                terms.extend((self.answers, t) for t in tokens(single or double or bare))
+            else:
+                terms.extend((self.words, t) for t in tokens(bare))
+        return terms
+
+    def search(self, query="", tags=(), limit=50):
+        """(nº de aciertos, primeros `limit` ítems) que cumplen la consulta y todas las etiquetas."""
+        postings = [index.get(key, set()) for index, key in self.parse(query)]
+        postings += [self.tags.get(tag_slug(t), set()) for t in tags]
+        if not postings:
+            return 0, []
+        postings.sort(key=len)
+        hits = set(postings[0])
+        for p in postings[1:]:
+            hits &= p
+            if not hits:
+                break
+        return len(hits), [self.bank.items[pos] for pos in sorted(hits)[:limit]]
+
+
+_indexes = {}  # ruta del banco -> SearchIndex
+_lock = threading.Lock()
+
+
+def get_search_index(bank):
+    """Índice de la versión actual del banco (se construye una vez por versión)."""
+    index = _indexes.get(bank.filename)
+    if index is not None and index.version == bank.version:
+        return index
+    with _lock:
+        index = _indexes.get(bank.filename)
+        if index is None or index.version != bank.version:
+            index = _indexes[bank.filename] = SearchIndex(bank)
+    return index
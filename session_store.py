@@ -0,0 +1,191 @@
+"""Almacén de estado por sesión para sobrevivir al F5.
+
+Cada navegador tiene su propio token (viaja en la URL como `?sid=`), así que
+un usuario ya no pisa el estado de otro. El backend es intercambiable:
+por defecto SQLite en modo WAL, con las escrituras agrupadas en un hilo
+aparte para no bloquear el hilo del script.
+
+Con varias réplicas (FCE_SHARED_DIR, ver shared_volume.py) todas comparten la
+misma base de datos, así que la sesión se recupera en cualquiera de ellas.
+"""
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from shared_volume import shared_path
+
+DEFAULT_DB = 'fce_state.db'
+
+
+class SessionStore:
+    """Interfaz mínima de un backend de estado (token + parte -> dict)."""
+
+    def load(self, token, part):
+        raise NotImplementedError
+
+    def save(self, token, part, state):
+        raise NotImplementedError
+
+    def clear(self, token, part):
+        raise NotImplementedError
+
+    def flush(self):
+        """Espera a que las escrituras pendientes lleguen al backend."""
+
+
+class MemorySessionStore(SessionStore):
+    """Backend en memoria del proceso (útil para pruebas y despliegues efímeros)."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def load(self, token, part):
+        with self._lock:
+            state = self._data.get((token, part))
+        return None if state is None else json.loads(state)
+
+    def save(self, token, part, state):
+        with self._lock:
+            self._data[(token, part)] = json.dumps(state)
+
+    def clear(self, token, part):
+        with self._lock:
+            self._data.pop((token, part), None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Backend SQLite (WAL). Las escrituras se encolan y un hilo las vuelca por lotes.
+
+    La lectura es una consulta por clave primaria (token, part): no depende del
+    número de sesiones activas. Mientras una escritura está pendiente, `load`
+    la sirve desde memoria para que el propio usuario la vea al instante.
+    """
+    _DELETE = object()
+
+    def __init__(self, path=DEFAULT_DB, batch_interval=0.05):
+        self.path = path
+        self.batch_interval = batch_interval
+        self._local = threading.local()
+        self._pending = {}  # (token, part) -> json | _DELETE
+        self._pending_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._init_schema()
+        self._writer = threading.Thread(target=self._write_loop, name="fce-state-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)  # No perder el último lote al apagar el servidor
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    token TEXT NOT NULL,
+                    part TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    updated REAL NOT NULL,
+                    PRIMARY KEY (token, part)
+                ) WITHOUT ROWID
+            """)
+        conn.close()
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # --- API ---
+    def load(self, token, part):
+        with self._pending_lock:
+            pending = self._pending.get((token, part))
+        if pending is self._DELETE:
+            return None
+        if pending is not None:
+            return json.loads(pending)
+        row = self._reader().execute(
+            "SELECT state FROM sessions WHERE token = ? AND part = ?", (token, part)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, token, part, state):
+        self._enqueue((token, part), json.dumps(state))
+
+    def clear(self, token, part):
+        self._enqueue((token, part), self._DELETE)
+
+    def flush(self):
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    # --- Escritor en segundo plano ---
+    def _enqueue(self, key, value):
+        with self._pending_lock:
+            self._pending[key] = value
+        self._queue.put(key)
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            waiters = []
+            item = self._queue.get()
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+            # Agrupamos todo lo que llegue en la ventana del lote
+            time.sleep(self.batch_interval)
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+
+            with self._pending_lock:
+                batch, self._pending = self._pending, {}
+            upserts = [(k[0], k[1], v, time.time()) for k, v in batch.items() if v is not self._DELETE]
+            deletes = [k for k, v in batch.items() if v is self._DELETE]
+            try:
+                with conn:
+                    if upserts:
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO sessions (token, part, state, updated) VALUES (?, ?, ?, ?)",
+                            upserts)
+                    if deletes:
+                        conn.executemany("DELETE FROM sessions WHERE token = ? AND part = ?", deletes)
+            except sqlite3.Error as e:
+                print(f"Error guardando estado: {e}")
+            for w in waiters:
+                w.set()
+
+
+# ==============================================================================
+# SELECCIÓN DEL BACKEND
+# ==============================================================================
+BACKENDS = {
+    "sqlite": lambda: SQLiteSessionStore(os.environ.get("FCE_STATE_DB") or shared_path(DEFAULT_DB)),
+    "memory": MemorySessionStore,
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Backend compartido por todo el proceso (FCE_STATE_BACKEND=sqlite|memory)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = BACKENDS[os.environ.get("FCE_STATE_BACKEND", "sqlite")]()
+    return _store
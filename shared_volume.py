@@ -0,0 +1,53 @@
+"""Modo réplicas: varias instancias de la app sobre una carpeta compartida.
+
+Con FCE_SHARED_DIR apuntando a un volumen local compartido (el mismo disco para
+todas las réplicas de la máquina), todas usan los mismos archivos:
+
+    fce_state.db        estado de cada sesión (SQLite WAL, bloqueos de SQLite)
+    fce_stats.db        agregados de dificultad y ratings
+    fce_attempts.jsonl  registro de intentos (cada lote se añade con flock)
+    *.fceb              bancos compilados: una réplica compila el CSV con el
+                        cerrojo cogido y todas abren el mismo archivo con mmap
+
+Así un usuario que tras el F5 cae en otra réplica recupera su Part 1, 2 o 3, y
+los bancos se compilan una vez y ocupan una sola copia en la caché de páginas.
+Las rutas explícitas (FCE_STATE_DB, FCE_STATS_DB, FCE_ATTEMPT_LOG) siguen
+mandando sobre la carpeta compartida.
+
+No sirve para sistemas de archivos de red (NFS, SMB): SQLite en modo WAL
+necesita memoria compartida entre los procesos.
+"""
+import contextlib
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin flock (una sola réplica)
+    fcntl = None
+
+
+def shared_dir():
+    """Carpeta compartida entre réplicas (FCE_SHARED_DIR) o None si no hay modo réplicas."""
+    return os.environ.get("FCE_SHARED_DIR") or None
+
+
+def shared_path(name):
+    """Ruta por defecto de un archivo de estado: en la carpeta compartida o en el directorio actual."""
+    directory = shared_dir()
+    if directory is None:
+        return name
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, name)
+
+
+@contextlib.contextmanager
+def file_lock(path, shared=False):
+    """Cerrojo entre procesos sobre `path` (se crea si no existe). Bloquea hasta conseguirlo."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield f
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
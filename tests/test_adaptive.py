@@ -0,0 +1,53 @@
+import random
+import sqlite3
+
+from adaptive import DEFAULT_RATING, K_ITEM, K_LEARNER, BucketIndex, RatingEngine
+
+
+def test_replicas_add_their_rating_changes(tmp_path):
+    db = str(tmp_path / "stats.db")
+    a, b = RatingEngine(db), RatingEngine(db)  # Dos réplicas con su copia en memoria
+    a.update("p2", "ana", "item-1", 1.0)
+    b.update("p2", "luis", "item-1", 1.0)
+    a.flush()
+    b.flush()
+
+    conn = sqlite3.connect(db)
+    rating, n = conn.execute("SELECT rating, n FROM item_ratings WHERE item_id = 'item-1'").fetchone()
+    assert n == 2
+    assert rating == DEFAULT_RATING - 2 * K_ITEM * 0.5  # Cada réplica restó lo suyo desde 1500
+    learners = dict(conn.execute("SELECT learner, rating FROM learner_ratings"))
+    assert learners == {"ana": DEFAULT_RATING + K_LEARNER * 0.5, "luis": DEFAULT_RATING + K_LEARNER * 0.5}
+
+
+def test_bucket_index_add_move_remove():
+    index = BucketIndex()
+    index.add("a", 1500)
+    index.add("b", 1510)
+    index.add("c", 1700)
+    assert len(index) == 3
+    assert sorted(index.buckets[30]) == ["a", "b"]
+
+    index.move("a", 1520)  # Misma cubeta: no se mueve
+    assert sorted(index.buckets[30]) == ["a", "b"]
+    index.move("a", 1710)
+    assert index.buckets[30] == ["b"]
+    assert sorted(index.buckets[34]) == ["a", "c"]
+
+    index.remove("b")
+    assert 30 not in index.buckets
+    assert len(index) == 2
+
+
+def test_bucket_index_near_skips_excluded_ids():
+    index = BucketIndex()
+    for i in range(10):
+        index.add(f"easy-{i}", 1200)
+    index.add("target", 1500)
+    index.add("hard", 1800)
+    rng = random.Random(0)
+    assert index.near(1500, rng=rng) == "target"
+    assert index.near(1500, exclude={"target"}, rng=rng) in {"hard"} | {f"easy-{i}" for i in range(10)}
+    assert index.near(1790, exclude={"hard"}, rng=rng) == "target"
+    everything = {"target", "hard"} | {f"easy-{i}" for i in range(10)}
+    assert index.near(1500, exclude=everything, rng=rng) is None
@@ -0,0 +1,17 @@
+import json
+
+from attempt_log import AttemptLog
+
+
+def test_wrong_answers_are_grouped_by_normalized_form(tmp_path):
+    log = AttemptLog(str(tmp_path / "attempts.jsonl"), str(tmp_path / "stats.db"), flush_interval=0)
+    for typed in ("Of", "of ", "OF"):
+        log.record("ana", "p2", "item-1", [typed, "the"], [False, True], 30.0, 300, given=["of", "the"])
+    log.record("luis", "p2", "item-1", ["at", "the"], [False, True], 30.0, 300)
+    log.flush()
+
+    gaps = log.gap_stats("p2", "item-1")
+    assert gaps[0]["common_wrong"] == "of ×3, at ×1"
+    assert gaps[1]["accuracy"] == 1.0
+    logged = [a for line in open(tmp_path / "attempts.jsonl") for a in json.loads(line)["answer"]]
+    assert logged == ["Of", "the", "of ", "the", "OF", "the", "at", "the"]
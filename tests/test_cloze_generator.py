@@ -0,0 +1,57 @@
+import io
+import json
+import random
+import re
+
+from cloze_generator import generate, gap_words, make_cloze
+
+WORDS = gap_words()
+PARAGRAPH = ("The museum which opened in the spring is one of the largest in the country. Visitors come from "
+             "all over the world to see the paintings, which were donated by a local family. Many of them stay "
+             "for hours because there is so much to see, and the guides are always happy to answer questions "
+             "about the history of the building.")
+
+
+def test_gaps_are_spaced_and_numbered_in_order():
+    text, answers = make_cloze(PARAGRAPH, WORDS, 4, spacing=8)
+    assert re.findall(r"_(\d+)_", text) == ["1", "2", "3", "4"]
+    words = re.findall(r"_\d+_|[A-Za-z]+", text)
+    positions = [i for i, w in enumerate(words) if w.startswith("_")]
+    assert all(b - a >= 8 for a, b in zip(positions, positions[1:]))
+    # Al devolver las respuestas a su sitio sale el párrafo original
+    restored = text
+    for n, answer in enumerate(answers, start=1):
+        restored = restored.replace(f"_{n}_", answer.split("/")[0])
+    assert restored == PARAGRAPH
+
+
+def test_too_many_gaps_for_the_spacing():
+    assert make_cloze(PARAGRAPH, WORDS, 6, spacing=20) is None
+
+
+def test_which_accepts_that_only_in_defining_clauses():
+    text = "We visited the house which my grandfather built, which is now a hotel, in which we stayed."
+    _, answers = make_cloze(text, frozenset({"which"}), 3, spacing=1)
+    assert answers == ["which/that", "which", "which"]
+
+
+def _corpus(path, n_docs):
+    rng = random.Random(3)
+    sentences = PARAGRAPH.split(". ")
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n_docs):
+            text = ". ".join(rng.sample(sentences, len(sentences))).rstrip(".") + "."
+            f.write(json.dumps({"title": f"Doc {i}", "url": f"http://example.com/{i}", "text": text}) + "\n")
+
+
+def test_same_output_with_one_or_several_processes(tmp_path):
+    corpus = str(tmp_path / "corpus.jsonl")
+    _corpus(corpus, 30)
+    outputs = []
+    for processes in (1, 3):
+        out = io.StringIO()
+        n_docs, _, n_rows = generate(corpus, out, processes=processes, batch_size=4, gaps=3, spacing=6)
+        assert (n_docs, n_rows) == (30, 30)
+        outputs.append(out.getvalue())
+    assert outputs[0] == outputs[1]
+    assert outputs[0].startswith("Title,Text,Answers,URL")
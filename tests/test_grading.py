@@ -0,0 +1,58 @@
+import pandas as pd
+
+from grading import grade_file, grade_frame, normalize
+from item_bank import Bank, compile_rows
+
+ROWS = [{"Title": "Holidays", "Text": "We went (1) ___ the beach and (2) ___ was sunny.", "Answers": "to|it"}]
+
+
+def _bank():
+    return Bank("p2", "test.csv", "v1", compile_rows("p2", ROWS))
+
+
+def _sheets(*rows):
+    return pd.DataFrame(rows, columns=["Student", "Item", "Answers"])
+
+
+def test_chunk_without_known_items():
+    out = grade_frame(_bank(), _sheets(("ana", "p2-missing", "to|it"), ("luis", "", "")))
+    assert list(out["Status"]) == ["unknown item", "unknown item"]
+    assert list(out["Score"]) == [0, 0]
+    assert list(out["Total"]) == [0, 0]
+    assert list(out["Item"]) == ["p2-missing", ""]
+
+
+def test_known_and_unknown_items_in_one_chunk():
+    bank = _bank()
+    item_id = bank.items[0].id
+    out = grade_frame(bank, _sheets(("ana", item_id, "to|It"), ("luis", "nope", "to|it"), ("eva", "Holidays", "at|it")))
+    assert list(out["Status"]) == ["ok", "unknown item", "ok"]
+    assert list(out["Score"]) == [2, 0, 1]
+    assert list(out["Total"]) == [2, 0, 2]
+    assert list(out["Correct"]) == ["1|1", "", "0|1"]
+    assert out["Item"][2] == item_id
+
+
+def test_british_spelling_only_for_real_words():
+    assert normalize("p2", "Colors") == "colours"
+    assert normalize("p2", "centered") == "centred"
+    assert normalize("p3", "recognize") == "recognise"
+    assert normalize("p2", "metering") == "metering"
+    assert normalize("p2", "programmer") == "programmer"
+    assert normalize("p1", "color") == "color"
+
+
+def test_grade_file_in_chunks_across_processes(tmp_path):
+    with open(tmp_path / "fce_open_cloze.csv", "w", encoding="utf-8") as f:
+        f.write('Title,Text,Answers,URL\nHolidays,"We went _1_ the beach and _2_ was sunny.",to|it,\n')
+    sheets = tmp_path / "sheets.csv"
+    with open(sheets, "w", encoding="utf-8") as f:
+        f.write("Student,Item,Answers\n" + "".join(f"s{i},Holidays,{'to' if i % 2 else 'at'}|it\n" for i in range(25)))
+        f.write("x,Missing,to|it\n")
+
+    outs = []
+    for processes in (1, 2):
+        out = tmp_path / f"out{processes}.csv"
+        assert grade_file("p2", str(sheets), str(out), str(tmp_path), processes, chunksize=4) == (26, 1, 37, 50)
+        outs.append(out.read_text())
+    assert outs[0] == outs[1]
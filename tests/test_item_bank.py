@@ -0,0 +1,70 @@
+import os
+
+import item_bank
+from bank_compiler import compile_bank
+from bank_reloader import BankReloader
+
+HEADER = "Title,Text,Answers,URL\n"
+ROWS = [
+    'One,"First _1_ text.",of,http://a\n',
+    'Two,"Second _1_ text.",the,http://b\n',
+    HEADER,                                   # cabecera repetida en mitad del archivo
+    'Three,"Third _1_ text.",a\n',            # sin URL: se rellena
+    'Four,"Fourth _1_ text.",an,http://d,x\n',  # campo de más
+    "\n",
+    'Five,"",in,http://e\n',                  # Text vacío
+]
+
+
+def _write(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HEADER + "".join(rows))
+    os.utime(path, ns=(os.stat(path).st_mtime_ns + 10**9,) * 2)  # Firma distinta aunque el tamaño coincida
+
+
+def test_repeated_header_and_broken_rows_are_skipped(tmp_path):
+    path = tmp_path / "fce_open_cloze.csv"
+    _write(path, ROWS)
+    titles = [r["Title"] for r in item_bank._read_rows(path, item_bank.BANK_SPECS["p2"][1])]
+    assert titles == ["One", "Two", "Three"]
+
+
+def test_loader_and_compiler_keep_the_same_rows(tmp_path):
+    path = tmp_path / "fce_open_cloze.csv"
+    _write(path, ROWS)
+    issues = []
+    n_ok, _, _ = compile_bank("p2", str(path), check_only=True, report=issues.append)
+    assert n_ok == len(list(item_bank._read_rows(path, item_bank.BANK_SPECS["p2"][1])))
+    assert {i.line: i.level for i in issues} == {4: "error", 5: "warning", 6: "error", 7: "error", 8: "error"}
+
+
+def test_first_reload_compiles_only_the_edited_rows(tmp_path):
+    path = tmp_path / "fce_open_cloze.csv"
+    _write(path, ROWS)
+    bank = item_bank.get_bank("p2", str(tmp_path))
+    assert [i.title for i in bank.items] == ["One", "Two", "Three"]
+
+    reloader = BankReloader(directory=str(tmp_path), interval=0, parts=("p2",))
+    reloader.check()  # Adopta la versión cargada por get_bank
+    _write(path, [ROWS[0].replace("First", "Edited"), *ROWS[1:]])
+    reloader.check()  # Primera vez que ve la firma nueva: espera una vuelta
+    assert reloader.check() == {"p2": "2 unchanged, 1 new/changed, 4 skipped row(s)"}
+    assert [i.title for i in item_bank.get_bank("p2", str(tmp_path)).items] == ["One", "Two", "Three"]
+
+
+def test_pinned_item_survives_an_answers_only_edit(tmp_path):
+    path = tmp_path / "fce_open_cloze.csv"
+    _write(path, ['Pinned,"Go _1_ foot _2_ school.",on|to,http://p\n'])
+    old = item_bank.get_bank("p2", str(tmp_path)).items[0]
+
+    reloader = BankReloader(directory=str(tmp_path), interval=0, parts=("p2",))
+    reloader.check()
+    for answers in ("by|the|x", "at|in", "of|for", "up|down", "a|b", "c|d"):  # Varias recargas seguidas
+        _write(path, [f'Pinned,"Go _1_ foot _2_ school.",{answers},http://p\n'])
+        reloader.check()
+        reloader.check()
+
+    bank = item_bank.get_bank("p2", str(tmp_path))
+    assert bank.items[0].answers == ("c", "d")
+    assert bank.items[0].id != old.id
+    assert item_bank.find_item(bank, old.id) == old
@@ -0,0 +1,56 @@
+import os
+import time
+
+from mock_exam import PackPool
+
+ROOTS = ["HAPPY", "CARE", "QUICK", "KIND", "POLITE", "EMPLOY", "AGREE", "REAL", "USE", "WIDE", "SUCCESS", "HOPE"]
+WORDS = ["unhappy", "careless", "quickly", "kindness", "impolite", "employees", "disagree", "reality",
+         "useful", "widen", "successful", "hopeless"]
+
+
+def _write_banks(directory, n_texts=5, tag=""):
+    with open(os.path.join(directory, "fce_part1.csv"), "w", encoding="utf-8") as f:
+        f.write("Title,Text,Options,Answers,URL\n")
+        for i in range(n_texts):
+            f.write(f'P1 {i}{tag},"Text {i} _1_ here.",a/b/c/d,a,\n')
+    with open(os.path.join(directory, "fce_open_cloze.csv"), "w", encoding="utf-8") as f:
+        f.write("Title,Text,Answers,URL\n")
+        for i in range(n_texts):
+            f.write(f'P2 {i}{tag},"Text {i} _1_ here.",of,\n')
+    with open(os.path.join(directory, "fce_data.csv"), "w", encoding="utf-8") as f:
+        f.write("Root,Sentence,Answer\n")
+        for root, word in zip(ROOTS, WORDS):
+            f.write(f"{root},It was ______{tag}.,{word}\n")
+
+
+def _wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_packs_do_not_repeat_items(tmp_path):
+    _write_banks(str(tmp_path))
+    pool = PackPool(size=4, low_water=1, p3_questions=8, directory=str(tmp_path))
+    packs = [pool.checkout() for _ in range(5)]
+    for pack in packs:
+        assert len(pack.p3) == len(set(pack.p3)) == 8
+    # Baraja compartida: cinco paquetes seguidos recorren los cinco textos de cada parte
+    assert len({pack.p1 for pack in packs}) == 5
+    assert len({pack.p2 for pack in packs}) == 5
+
+
+def test_pool_is_refilled_and_invalidated_on_a_new_version(tmp_path):
+    _write_banks(str(tmp_path))
+    pool = PackPool(size=3, low_water=1, p3_questions=4, directory=str(tmp_path))
+    pool.warm()
+    _wait_for(lambda: len(pool) == 3)
+    old_versions = pool.checkout().versions
+
+    _write_banks(str(tmp_path), tag=" v2")
+    pack = pool.checkout()  # Los paquetes de la reserva son de la versión anterior: no se usan
+    assert pack.versions != old_versions
+    # La reserva se vacía y se rellena con la versión nueva
+    _wait_for(lambda: len(pool) and all(p.versions == pack.versions for p in list(pool._ready)))
+    assert pool.checkout().versions == pack.versions
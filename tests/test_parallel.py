@@ -0,0 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from parallel import bounded_map
+
+
+def test_results_in_order_with_a_bounded_read_ahead():
+    read = []
+
+    def source():
+        for i in range(20):
+            read.append(i)
+            yield i
+
+    with ThreadPoolExecutor(2) as pool:
+        results = bounded_map(pool, lambda x: x * x, source(), window=3)
+        assert next(results) == 0
+        assert len(read) == 3  # No se lee más allá de la ventana
+        assert list(results) == [i * i for i in range(1, 20)]
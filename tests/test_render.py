@@ -0,0 +1,42 @@
+import pytest
+
+from item_bank import Item
+from render import compile_template, render_item
+
+
+def _item(text, answers):
+    return Item(id="p2-test", part="p2", title="Test", text=text, answers=answers)
+
+
+def test_well_formed_text_has_no_problems():
+    tpl = compile_template("A _1_ b _2_ c.", 2)
+    assert tpl.problems == ()
+    assert tpl.gaps == (1, 2)
+    assert tpl.fill(["X", "Y"]) == "A X b Y c."
+
+
+def test_duplicated_marker():
+    tpl = compile_template("_1_ and _1_", 2)
+    assert "duplicated gap markers" in tpl.problems
+    assert "missing gap markers: _2_" in tpl.problems
+
+
+def test_missing_markers():
+    assert compile_template("Only _2_ here.", 3).problems == ("missing gap markers: _1_, _3_",)
+
+
+def test_out_of_range_marker_stays_as_text():
+    tpl = compile_template("A _1_ b _4_ c.", 1)
+    assert tpl.problems == ("marker _4_ has no answer",)
+    assert tpl.fill(["X"]) == "A X b _4_ c."
+
+
+def test_blank_and_corrected_views():
+    item = _item("We went _1_ the beach, _2_ was sunny.", ("to", "which/that"))
+    assert render_item(item, "blank") == ("We went <span class='gap-highlight'>(1) .......</span> the beach, "
+                                          "<span class='gap-highlight'>(2) .......</span> was sunny.")
+    # La versión corregida muestra la respuesta principal de cada hueco
+    assert render_item(item, "corrected") == ("We went <span class='gap-correct'>to</span> the beach, "
+                                              "<span class='gap-correct'>which</span> was sunny.")
+    with pytest.raises(ValueError):
+        render_item(item, "other")
@@ -0,0 +1,36 @@
+import random
+
+import pytest
+
+from sampler import Deck
+
+
+@pytest.mark.parametrize("size, first, second", [(5, 3, 5), (94, 3, 94), (10, 7, 6), (50, 1, 49)])
+def test_draw_crossing_a_reshuffle_has_no_repeats(size, first, second):
+    deck = Deck(size, rng=random.Random(size))
+    deck.draw(first)
+    cards = deck.draw(second)
+    assert len(cards) == len(set(cards)) == second
+
+
+def test_whole_bank_is_seen_before_any_repeat():
+    deck = Deck(20, rng=random.Random(1))
+    seen = [c for _ in range(5) for c in deck.draw(4)]
+    assert sorted(seen) == list(range(20))
+
+
+def test_last_draw_goes_to_the_bottom_after_reshuffle():
+    deck = Deck(10, rng=random.Random(2))
+    deck.draw(8)
+    last = deck.draw(2)  # Agota la vuelta
+    assert set(last).isdisjoint(deck.draw(8))
+
+
+def test_more_cards_than_the_bank_repeats_only_across_rounds():
+    cards = Deck(3, rng=random.Random(4)).draw(7)
+    assert len(cards) == 7
+    assert len(set(cards[:3])) == 3 and len(set(cards[3:6])) == 3
+
+
+def test_empty_deck():
+    assert Deck(0).draw(3) == []
@@ -0,0 +1,47 @@
+from item_bank import Bank, compile_rows
+from search import SearchIndex
+
+ROWS = [
+    {"Title": "London trip", "Text": "We stayed in a hotel _1_ the river. It was full _2_ tourists.", "Answers": "by|of"},
+    {"Title": "Beach holiday", "Text": "One _1_ the best holidays, _2_ we went to the beach.", "Answers": "of|which/that"},
+    {"Title": "Of mice and men", "Text": "A book _1_ I read _2_ school.", "Answers": "that|at"},
+    {"Title": "Moving house", "Text": "We had to give _1_ the flat and set _2_ a new home.", "Answers": "up|up"},
+]
+
+
+def _index():
+    return SearchIndex(Bank("p2", "fce_open_cloze.csv", "v1", compile_rows("p2", ROWS)))
+
+
+def _titles(index, query="", tags=()):
+    return [item.title for item in index.search(query, tags)[1]]
+
+
+def test_parse_kinds_of_terms():
+    index = _index()
+    assert index.parse("holiday 'of' answer:which #phrasal-verbs tag:prepositions") == [
+        (index.words, "holiday"), (index.answers, "of"), (index.answers, "which"),
+        (index.tags, "phrasal-verbs"), (index.tags, "prepositions")]
+    assert index.parse('"Of"') == [(index.answers, "of")]
+
+
+def test_quoted_word_only_matches_answers():
+    index = _index()
+    assert _titles(index, "of") == ["London trip", "Beach holiday", "Of mice and men"]  # texto o título
+    assert _titles(index, "'of'") == ["London trip", "Beach holiday"]
+    assert _titles(index, "answer:that") == ["Beach holiday", "Of mice and men"]  # incluye alternativas
+
+
+def test_tags():
+    index = _index()
+    assert _titles(index, "#phrasal-verbs") == ["Moving house"]
+    assert _titles(index, "", tags=["relative pronouns"]) == ["Beach holiday", "Of mice and men"]
+    assert ("prepositions", 3) in index.tag_counts()
+
+
+def test_terms_combine_with_and():
+    index = _index()
+    assert _titles(index, "'of' beach") == ["Beach holiday"]
+    assert _titles(index, "'of' #relative-pronouns") == ["Beach holiday"]
+    assert _titles(index, "'of' london", tags=["phrasal verbs"]) == []
+    assert index.search("") == (0, [])
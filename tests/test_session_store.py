@@ -0,0 +1,52 @@
+import sqlite3
+
+from session_store import MemorySessionStore, SQLiteSessionStore
+
+
+def _stored(path, token, part):
+    return sqlite3.connect(path).execute(
+        "SELECT state FROM sessions WHERE token = ? AND part = ?", (token, part)).fetchone()
+
+
+def test_save_load_clear_round_trip(tmp_path):
+    path = str(tmp_path / "state.db")
+    store = SQLiteSessionStore(path, batch_interval=0)
+    state = {"ids": "p2-abc", "start": 1700000000.25, "limit": 300}
+    store.save("ana", "p2", state)
+    store.save("luis", "p2", {"ids": "p2-def", "start": 1.0, "limit": 60})
+    store.flush()
+
+    # Otro proceso (otra réplica) lee lo mismo desde el disco
+    other = SQLiteSessionStore(path)
+    assert other.load("ana", "p2") == state
+    assert other.load("ana", "p1") is None
+    assert other.load("luis", "p2")["ids"] == "p2-def"
+
+    store.clear("ana", "p2")
+    store.flush()
+    assert other.load("ana", "p2") is None
+    assert other.load("luis", "p2") is not None
+
+
+def test_pending_write_is_visible_before_it_reaches_the_database(tmp_path):
+    path = str(tmp_path / "state.db")
+    store = SQLiteSessionStore(path, batch_interval=0.3)
+    store.save("ana", "p1", {"ids": "p1-x", "start": 0, "limit": 300})
+    assert store.load("ana", "p1") == {"ids": "p1-x", "start": 0, "limit": 300}
+    assert _stored(path, "ana", "p1") is None
+    store.clear("ana", "p1")
+    assert store.load("ana", "p1") is None
+    store.save("ana", "p1", {"ids": "p1-y", "start": 0, "limit": 300})
+    store.flush()
+    assert _stored(path, "ana", "p1") is not None
+    assert store.load("ana", "p1")["ids"] == "p1-y"
+
+
+def test_memory_store_returns_copies():
+    store = MemorySessionStore()
+    state = {"ids": ["p3-a", "p3-b"], "answers": []}
+    store.save("ana", "p3", state)
+    state["answers"].append("x")
+    assert store.load("ana", "p3") == {"ids": ["p3-a", "p3-b"], "answers": []}
+    store.clear("ana", "p3")
+    assert store.load("ana", "p3") is None
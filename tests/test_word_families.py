@@ -0,0 +1,38 @@
+import pytest
+
+from item_bank import Bank, compile_rows
+from word_families import NEGATIVE, FamilyIndex, analyze
+
+
+@pytest.mark.parametrize("root, word, expected", [
+    ("happy", "unhappy", ("un", "", "other")),
+    ("happy", "unhappily", ("un", "ly", "adverb")),
+    ("quick", "quickly", ("", "ly", "adverb")),
+    ("care", "careless", ("", "less", "adjective")),
+    ("polite", "impolite", ("im", "", "other")),
+    ("employ", "employees", ("", "ee", "noun")),            # plural: se mira sin la -s
+    ("agree", "disagreements", ("dis", "ment", "noun")),
+    ("real", "reality", ("", "ity", "noun")),               # no es re- + ality
+])
+def test_analyze(root, word, expected):
+    assert analyze(root, word) == expected
+
+
+def _bank(version, rows):
+    rows = [{"Root": r, "Sentence": f"It was ______ ({r}).", "Answer": a} for r, a in rows]
+    return Bank("p3", "fce_data.csv", version, compile_rows("p3", rows))
+
+
+def test_family_index_is_updated_incrementally():
+    index = FamilyIndex()
+    v1 = _bank("v1", [("HAPPY", "unhappy"), ("CARE", "careless"), ("QUICK", "quickly")])
+    assert index.update(v1) == (3, 0)
+    assert len(index.ids("affix", NEGATIVE)) == 2
+    assert index.values("class") == [("adjective", 1), ("adverb", 1), ("other", 1)]
+
+    v2 = _bank("v2", [("HAPPY", "unhappy"), ("QUICK", "quickly"), ("KIND", "kindness")])
+    assert index.update(v2) == (1, 1)
+    assert index.update(v2) == (0, 0)
+    assert [v2.get(i).root for i in index.ids("affix", NEGATIVE)] == ["HAPPY"]
+    assert [v2.get(i).root for i in index.ids("root", "kind")] == ["KIND"]
+    assert index.ids("answer", "careless") == []
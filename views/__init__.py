@@ -0,0 +1,22 @@
+"""Vistas de la app, una por módulo.
+
+app.py solo importa la vista abierta (load): la portada no importa ninguna
+parte ni lee ningún banco, y cada parte carga sus datos la primera vez que se
+abre. Los módulos importados quedan en memoria para los reruns siguientes.
+"""
+import importlib
+
+# Valor de ?view= -> módulo con su función run()
+MODULES = {
+    "part1": "views.part1",
+    "part2": "views.part2",
+    "part3": "views.part3",
+    "mock": "views.mock",
+    "search": "views.search_view",
+    "analytics": "views.analytics",
+}
+
+
+def load(view):
+    """Módulo de la vista (se importa la primera vez que se abre)."""
+    return importlib.import_module(MODULES[view])
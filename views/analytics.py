@@ -0,0 +1,40 @@
+"""Analíticas: dificultad por ítem y por hueco a partir del registro de intentos."""
+import streamlit as st
+
+from attempt_log import get_log
+
+from views.common import load_data
+
+
+def run():
+    st.header("📈 Item Analytics")
+    st.markdown("<div class='instruction-box'><b>Item difficulty:</b> accuracy and timing from every graded answer, hardest items first.</div>", unsafe_allow_html=True)
+
+    parts = {"Part 1: Multiple Choice": "p1", "Part 2: Open Cloze": "p2", "Part 3: Word Formation": "p3"}
+    part = parts[st.selectbox("Part:", list(parts))]
+    bank = load_data(part)
+    stats = get_log().item_stats(part)
+    if not stats:
+        st.info("No attempts recorded yet for this part.")
+        return
+
+    def label(item_id):
+        item = bank.get(item_id) if bank else None
+        return item.title if item else item_id
+
+    st.dataframe([{
+        "Item": label(s["item_id"]),
+        "Submissions": s["submissions"],
+        "Accuracy": f"{s['accuracy'] * 100:.0f}%",
+        "Mean time (s)": round(s["mean_time_s"], 1),
+        "Time / limit": f"{s['mean_time_vs_limit'] * 100:.0f}%",
+    } for s in stats], width="stretch", hide_index=True)
+
+    chosen = st.selectbox("Gap detail:", [s["item_id"] for s in stats], format_func=label)
+    st.dataframe([{
+        "Gap": g["gap"],
+        "Attempts": g["attempts"],
+        "Accuracy": f"{g['accuracy'] * 100:.0f}%",
+        "Most common wrong answers": g["common_wrong"],
+    } for g in get_log().gap_stats(part, chosen)], width="stretch", hide_index=True)
+
@@ -0,0 +1,149 @@
+"""Piezas comunes a todas las vistas: persistencia por sesión, carga de bancos y reloj.
+
+Las vistas (views/part1.py, ...) se importan solo cuando se abren, así que lo
+que se usa en más de una vive aquí.
+"""
+import secrets
+import time
+
+import streamlit as st
+
+from adaptive import get_engine
+from attempt_log import get_log
+from bank_reloader import get_reloader
+from item_bank import find_item, get_bank
+from metrics import span
+from sampler import draw_items
+from session_store import get_store
+
+# ==============================================================================
+# 1. SISTEMA DE PERSISTENCIA (POR SESIÓN)
+# ==============================================================================
+def get_session_token():
+    """Token propio de cada navegador. Viaja en la URL (?sid=) igual que ?view, así sobrevive al F5"""
+    if 'sid' not in st.session_state:
+        sid = st.query_params.get("sid")
+        if not sid:
+            sid = secrets.token_urlsafe(12)
+            st.query_params["sid"] = sid
+        st.session_state.sid = sid
+    return st.session_state.sid
+
+def save_state_to_disk(key, item_ids, start, limit, **extra):
+    """Guarda el ejercicio activo (solo ids de ítems) y su reloj (inicio y límite) en el almacén de sesiones"""
+    try:
+        # La escritura real la hace un hilo en segundo plano: no bloquea el script
+        with span("persist"):
+            get_store().save(get_session_token(), key, {"ids": item_ids, "start": start, "limit": limit, **extra})
+    except Exception as e:
+        print(f"Error guardando estado: {e}")
+
+def load_state_from_disk(target_part):
+    """Intenta recuperar el estado de esta sesión si se borró de la memoria"""
+    try:
+        with span("persist"):
+            saved = get_store().load(get_session_token(), target_part)
+        # Estados con otro formato (versiones anteriores) se ignoran
+        return saved if saved and "ids" in saved else None
+    except Exception:
+        return None
+
+def log_attempt(part, item_id, answers, correct, elapsed, limit, given=None):
+    """Encola el intento corregido para el registro y las estadísticas (no bloquea el rerun).
+
+    `answers` es lo que escribió el alumno (solo va al log); `given`, lo normalizado que agregan las estadísticas.
+    """
+    try:
+        with span("persist"):
+            get_log().record(get_session_token(), part, item_id, answers, correct, elapsed, limit, given)
+            # Ratings de alumno e ítem: se actualizan en memoria y se guardan en segundo plano
+            get_engine().update(part, get_session_token(), item_id, sum(map(bool, correct)) / max(len(correct), 1))
+    except Exception as e:
+        print(f"Error registrando intento: {e}")
+
+def first_submission(part):
+    """True solo la primera vez que se corrige el ejercicio activo de Part 1/2: reenviar no vuelve a contar.
+
+    El ejercicio es su ítem más su hora de inicio (Start, Try Another, el simulacro y la
+    búsqueda siempre empiezan uno nuevo). Se guarda en disco para que tras un F5 tampoco cuente dos veces.
+    """
+    ss = st.session_state
+    exercise = [ss[f"{part}_item"], ss[f"{part}_start"]]
+    if ss.get(f"{part}_logged") == exercise:
+        return False
+    ss[f"{part}_logged"] = exercise
+    save_state_to_disk(part, *exercise, ss[f"{part}_limit"], logged=True)
+    return True
+
+def clear_state_from_disk(target_part):
+    try:
+        get_store().clear(get_session_token(), target_part)
+    except Exception as e:
+        print(f"Error borrando estado: {e}")
+
+# ==============================================================================
+# 2. FUNCIÓN DE CARGA DE DATOS
+# ==============================================================================
+def load_data(part):
+    """Devuelve el banco compilado (compartido entre sesiones) o None si no se pudo leer"""
+    with span("load_data"):
+        bank = get_bank(part)
+    # Recarga en segundo plano de los bancos ya cargados (FCE_RELOAD_INTERVAL, 0 = desactivada).
+    # Arranca con la primera vista que necesita datos: la portada no lee ningún banco
+    get_reloader()
+    return bank
+
+def current_item(bank, key):
+    """La sesión solo guarda el id; el ítem (inmutable) se lee del banco compartido.
+    Si el banco se recargó a mitad del ejercicio, se sigue usando la versión con la que empezó"""
+    item_id = st.session_state.get(key)
+    return None if item_id is None else find_item(bank, item_id)
+
+RECENT_ADAPTIVE = 20
+
+def draw_from_bank(bank, n=1):
+    """Saca n ítems sin repetir en esta sesión hasta agotar el banco.
+    En modo adaptativo se eligen cerca del nivel del alumno, evitando los últimos vistos"""
+    if st.session_state.get('adaptive'):
+        recent = st.session_state.setdefault('recent', {}).setdefault(bank.part, [])
+        items = get_engine().select(bank, get_session_token(), n, recent=recent)
+        recent[:] = (recent + [item.id for item in items])[-RECENT_ADAPTIVE:]
+        return items
+    if 'decks' not in st.session_state:
+        st.session_state.decks = {}
+    return draw_items(st.session_state.decks, bank, n)
+
+# --- Temporizador en vivo ---
+# El fragmento se re-ejecuta solo cada segundo: no recarga datos ni vuelve a pintar
+# el texto o el formulario. El tiempo límite se sigue comprobando en el servidor
+# al enviar, a partir de la hora de inicio guardada en la sesión.
+@st.fragment(run_every=1)
+def live_timer(start_key, limit_key, style="progress"):
+    start = st.session_state.get(start_key)
+    limit = st.session_state.get(limit_key)
+    if start is None or not limit:
+        return
+    elapsed = time.time() - start
+    remaining = max(0, limit - elapsed)
+    if style == "progress":
+        st.progress(min(1.0, elapsed / limit), text=f"Time Remaining: {int(remaining)}s")
+    else:
+        st.caption(f"⏱️ Time: {int(remaining)}s")
+    if remaining <= 0:
+        st.caption("⏰ Time is up! Your answers will be marked as late.")
+
+# ==============================================================================
+# 3. SIMULACRO: NOTA DE CADA PARTE
+# ==============================================================================
+# Las partes anotan aquí su nota cuando se corrigen dentro de un simulacro
+# (views/mock.py), sin tener que importar la vista del simulacro
+def save_mock_progress():
+    ss = st.session_state
+    save_state_to_disk("mock", ss.mock_pack, ss.mock_start, ss.mock_limit, step=ss.mock_step, scores=ss.mock_scores)
+
+def record_mock_score(part, score, total):
+    """Guarda la primera nota de cada parte dentro del simulacro (no cuenta reenviar)"""
+    ss = st.session_state
+    if ss.get("mock_active") and part not in ss.mock_scores:
+        ss.mock_scores[part] = [score, total]
+        save_mock_progress()
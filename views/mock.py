@@ -0,0 +1,124 @@
+"""Simulacro completo: Parts 1-3 seguidas con un solo reloj."""
+import importlib
+import time
+
+import streamlit as st
+
+from item_bank import find_item
+from metrics import span
+from mock_exam import get_pack_pool
+
+from views.common import (clear_state_from_disk, load_data, load_state_from_disk, save_mock_progress,
+                          save_state_to_disk)
+from views.part3 import save_p3_progress
+
+
+MOCK_PARTS = ("p1", "p2", "p3")
+MOCK_NAMES = {"p1": "Part 1: Multiple Choice", "p2": "Part 2: Open Cloze", "p3": "Part 3: Word Formation"}
+MOCK_VIEWS = {"p1": "views.part1", "p2": "views.part2", "p3": "views.part3"}
+
+def start_mock(pack, limit):
+    """Carga el paquete en el estado de las tres partes, todas con el reloj del examen"""
+    ss = st.session_state
+    now = time.time()
+    for key in [k for k in ss if k.startswith(("p1_q", "p2_q"))]:
+        del ss[key]  # Respuestas de un ejercicio anterior
+    ss.mock_pack, ss.mock_start, ss.mock_limit = pack.to_dict(), now, limit
+    ss.mock_step, ss.mock_scores, ss.mock_active = 0, {}, True
+    ss.pop("mock_result", None)
+    for part in ("p1", "p2"):
+        ss[f"{part}_item"] = getattr(pack, part)
+        ss[f"{part}_active"] = True
+        ss[f"{part}_start"] = now
+        ss[f"{part}_limit"] = limit
+        save_state_to_disk(part, getattr(pack, part), now, limit)
+    ss.p3_items, ss.p3_answers, ss.p3_total = list(pack.p3), [], len(pack.p3)
+    ss.p3_limit, ss.p3_index, ss.p3_score = limit, 0, 0
+    ss.p3_feedback, ss.p3_active, ss.p3_q_start = None, True, now
+    ss.pop("p3_finished", None)
+    save_p3_progress()
+    save_mock_progress()
+
+def finish_mock():
+    ss = st.session_state
+    pack = ss.mock_pack
+    totals = {"p1": None, "p2": None, "p3": len(pack["p3"])}
+    for part in ("p1", "p2"):
+        item = find_item(load_data(part), pack[part])
+        totals[part] = item.n_gaps if item else 0
+    # Part 3 solo se apunta al terminar: si se acaba antes, cuentan las preguntas ya contestadas
+    fallback = {"p1": [0, totals["p1"]], "p2": [0, totals["p2"]], "p3": [ss.get("p3_score", 0), totals["p3"]]}
+    ss.mock_result = {"scores": {p: ss.mock_scores.get(p, fallback[p]) for p in MOCK_PARTS},
+                      "elapsed": time.time() - ss.mock_start, "limit": ss.mock_limit}
+    ss.mock_active = False
+    ss.p1_active = ss.p2_active = ss.p3_active = False
+    ss.pop("p3_finished", None)
+    for key in ("mock", *MOCK_PARTS):
+        clear_state_from_disk(key)
+
+def run():
+    ss = st.session_state
+    if 'mock_active' not in ss:
+        recovered = load_state_from_disk("mock")
+        if recovered:
+            ss.mock_pack, ss.mock_start, ss.mock_limit = recovered["ids"], recovered["start"], recovered["limit"]
+            ss.mock_step, ss.mock_scores, ss.mock_active = recovered["step"], recovered["scores"], True
+            st.toast("Sesión restaurada", icon="🔄")
+
+    if not ss.get("mock_active"):
+        st.header("🎓 Mock Exam: Reading & Use of English")
+        result = ss.get("mock_result")
+        if result:
+            got = sum(s for s, _ in result["scores"].values())
+            out_of = sum(t for _, t in result["scores"].values())
+            st.metric("Exam Score", f"{got}/{out_of}", f"{got / out_of * 100:.1f}%" if out_of else None)
+            st.dataframe([{"Part": MOCK_NAMES[p], "Score": f"{s}/{t}"} for p, (s, t) in result["scores"].items()],
+                         width="stretch", hide_index=True)
+            minutes = result["elapsed"] / 60
+            if result["elapsed"] > result["limit"]:
+                st.error(f"⏰ Finished in {minutes:.1f} min, over the {result['limit'] / 60:.0f} min limit.")
+            else:
+                st.success(f"✅ Finished in {minutes:.1f} min.")
+            st.divider()
+
+        st.markdown("<div class='instruction-box'><b>Instructions:</b> Parts 1, 2 and 3 back to back under one clock. "
+                    "Submit each part and continue; the texts cannot be changed during the exam.</div>", unsafe_allow_html=True)
+        minutes = st.slider("⏱️ Exam time (minutes):", 10, 60, 25, 5, key="slider_mock")
+        # La reserva se rellena en segundo plano mientras el alumno lee las instrucciones
+        pool = get_pack_pool()
+        pool.warm()
+        st.caption(f"{len(pool)} exam pack(s) ready")
+        if st.button("🚀 Start Mock Exam", type="primary"):
+            with span("load_data"):
+                pack = pool.checkout()
+            if pack is None:
+                st.error("⚠️ Error: Could not load the item banks.")
+                return
+            start_mock(pack, minutes * 60)
+            st.rerun()
+        return
+
+    step = ss.mock_step
+    st.caption(f"🎓 Mock exam · Part {step + 1} of {len(MOCK_PARTS)}")
+    st.progress(step / len(MOCK_PARTS))
+    part = MOCK_PARTS[step]
+    if part == "p3" and "p3" in ss.mock_scores and not ss.get("p3_active"):
+        s, t = ss.mock_scores["p3"]
+        st.success(f"Part 3 complete: {s}/{t}")
+    else:
+        importlib.import_module(MOCK_VIEWS[part]).run()
+
+    st.divider()
+    if time.time() - ss.mock_start > ss.mock_limit:
+        st.warning("⏰ Time is up. Finish the exam to see your results.")
+    col1, col2 = st.columns(2)
+    with col1:
+        if step < len(MOCK_PARTS) - 1 and st.button(f"➡️ Continue to Part {step + 2}", type="primary"):
+            ss.mock_step += 1
+            save_mock_progress()
+            st.rerun()
+    with col2:
+        if st.button("🏁 Finish Exam", type="primary" if step == len(MOCK_PARTS) - 1 else "secondary"):
+            finish_mock()
+            st.rerun()
+
@@ -0,0 +1,145 @@
+"""Part 1: Multiple Choice Cloze."""
+import time
+
+import streamlit as st
+
+from grading import grade_item
+from metrics import span
+from render import render_item, template_for
+
+from views.common import (current_item, draw_from_bank, first_submission, live_timer, load_data, load_state_from_disk,
+                          log_attempt, record_mock_score, save_state_to_disk)
+
+
+def run():
+    st.header("🔡 Part 1: Multiple Choice Cloze")
+    bank = load_data("p1")
+    
+    if bank is None or len(bank) == 0:
+        st.error("⚠️ Error: Could not find 'fce_part1.csv'.")
+        return
+
+    # --- RECUPERACIÓN DE EMERGENCIA ---
+    if 'p1_item' not in st.session_state:
+        # Intentamos cargar del disco
+        recovered = load_state_from_disk("p1")
+        if recovered:
+            st.session_state.p1_item = recovered["ids"]
+            st.session_state.p1_active = True
+            st.session_state.p1_start = recovered["start"] # El reloj sigue donde estaba
+            st.session_state.p1_limit = recovered["limit"]
+            if recovered.get("logged"):  # Ya se corrigió antes del F5: reenviar no cuenta
+                st.session_state.p1_logged = [recovered["ids"], recovered["start"]]
+            st.toast("Sesión restaurada", icon="🔄")
+
+    # --- Setup ---
+    if 'p1_active' not in st.session_state: st.session_state.p1_active = False
+
+    if not st.session_state.p1_active:
+        st.markdown("<div class='instruction-box'><b>Instructions:</b> Read the text. For each gap (1-8), choose the best word (A, B, C, or D). Focus on collocations and phrasal verbs.</div>", unsafe_allow_html=True)
+        time_limit = st.slider("⏱️ Time Limit (seconds):", 60, 600, 300, 30, key="slider_p1")
+        
+        if st.button("🚀 Start Part 1", type="primary"):
+            row = draw_from_bank(bank)[0]
+            st.session_state.p1_item = row.id
+            st.session_state.p1_active = True
+            st.session_state.p1_start = time.time()
+            st.session_state.p1_limit = time_limit
+            
+            # GUARDAR EN DISCO (NUEVO)
+            save_state_to_disk("p1", row.id, st.session_state.p1_start, st.session_state.p1_limit)
+            st.rerun()
+
+    # --- Exam ---
+    else:
+        # El Item ya viene compilado: respuestas y opciones separadas en listas.
+        row = current_item(bank, "p1_item")
+        if row is None:
+            st.error("Datos perdidos. Por favor reinicia la Parte 1.")
+            if st.button("Reiniciar"):
+                st.session_state.p1_active = False
+                st.rerun()
+            return
+        
+        respuestas = row.answers
+        opciones_matriz = row.options
+
+        # Timer
+        live_timer("p1_start", "p1_limit")
+
+        # Header
+        col_t1, col_t2 = st.columns([3, 1])
+        with col_t1: st.subheader(f"Topic: {row.title}")
+        with col_t2: 
+             if row.url: st.link_button("📖 Source", row.url)
+
+        # Text Display
+        problems = template_for(row).problems
+        if problems: st.warning("⚠️ This text has formatting issues: " + "; ".join(problems))
+        with span("render"):
+            texto_visual = render_item(row, "blank")
+        st.markdown(f"<div class='text-box'>{texto_visual}</div>", unsafe_allow_html=True)
+        
+        st.divider()
+
+        # Questions Grid
+        with span("form"), st.form("form_p1"):
+            user_ans = []
+            cols = st.columns(2)
+            for i in range(len(respuestas)):
+                with cols[i % 2]:
+                    if i < len(opciones_matriz):
+                        user_ans.append(st.radio(f"**Gap {i+1}**", opciones_matriz[i], horizontal=True, index=None, key=f"p1_q{i}"))
+                    else:
+                        user_ans.append(None)
+            
+            submitted = st.form_submit_button("Submit Answers", type="primary")
+
+        # Results
+        if submitted:
+            final_time = time.time() - st.session_state.p1_start
+            
+            if final_time > st.session_state.p1_limit:
+                 st.error(f"⏰ TIME OUT! You took {int(final_time)}s.")
+            else:
+                 st.success(f"✅ Submitted in {int(final_time)}s.")
+
+            st.write("### 📊 Results")
+            with span("grading"):
+                grade = grade_item(row, user_ans)
+                aciertos = list(grade.correct)
+                score = grade.score
+            for i, (u, c, ok) in enumerate(zip(user_ans, respuestas, aciertos)):
+                if ok:
+                    st.write(f"Gap {i+1}: ✅ **{c}**")
+                else:
+                    st.write(f"Gap {i+1}: ❌ You said *{u or 'None'}* | Correct: **{c}**")
+
+            st.metric("Final Score", f"{score}/{len(respuestas)}")
+            if first_submission("p1"):  # Las estadísticas y el rating cuentan solo el primer envío
+                log_attempt("p1", row.id, user_ans, aciertos, final_time, st.session_state.p1_limit,
+                            grade.given)
+            record_mock_score("p1", score, len(respuestas))
+            
+            # Full Text Reconstruction
+            st.markdown("---")
+            st.info("📖 **Full Corrected Text:**")
+            with span("render"):
+                full_text = render_item(row, "corrected")
+            st.markdown(f"<div class='text-box'>{full_text}</div>", unsafe_allow_html=True)
+
+        # BOTÓN NUEVO TEXTO
+        # En el simulacro el texto es el del paquete: no se puede cambiar
+        if not st.session_state.get("mock_active") and st.button("🔄 Try Another Text"):
+            if len(bank) > 1:
+                # La baraja garantiza que no se repite ningún texto hasta agotar el banco
+                nuevo_row = draw_from_bank(bank)[0]
+                
+                st.session_state.p1_item = nuevo_row.id
+                st.session_state.p1_start = time.time()
+                # GUARDAR NUEVO EN DISCO
+                save_state_to_disk("p1", nuevo_row.id, st.session_state.p1_start, st.session_state.p1_limit)
+                st.rerun()
+            else:
+                st.warning("Solo hay 1 ejercicio en la base de datos.")
+
@@ -0,0 +1,134 @@
+"""Part 2: Open Cloze."""
+import time
+
+import streamlit as st
+
+from grading import grade_item
+from metrics import span
+from render import render_item, template_for
+
+from views.common import (current_item, draw_from_bank, first_submission, live_timer, load_data, load_state_from_disk,
+                          log_attempt, record_mock_score, save_state_to_disk)
+
+
+def run():
+    st.header("🧩 Part 2: Open Cloze")
+    bank = load_data("p2")
+    
+    if bank is None or len(bank) == 0:
+        st.error("⚠️ Error: Could not find 'fce_open_cloze.csv'.")
+        return
+
+    # --- RECUPERACIÓN DE EMERGENCIA ---
+    if 'p2_item' not in st.session_state:
+        # Intentamos cargar del disco
+        recovered = load_state_from_disk("p2")
+        if recovered:
+            st.session_state.p2_item = recovered["ids"]
+            st.session_state.p2_active = True
+            st.session_state.p2_start = recovered["start"]
+            st.session_state.p2_limit = recovered["limit"]
+            if recovered.get("logged"):  # Ya se corrigió antes del F5: reenviar no cuenta
+                st.session_state.p2_logged = [recovered["ids"], recovered["start"]]
+            st.toast("Sesión restaurada desde archivo", icon="📂")
+    # ----------------------------------
+
+    if 'p2_active' not in st.session_state: st.session_state.p2_active = False
+
+    # ESTADO INICIAL (Instrucciones)
+    if not st.session_state.p2_active:
+        st.markdown("<div class='instruction-box'><b>Instructions:</b> Read the text. Think of the word which best fits each gap. Use only ONE word in each gap.</div>", unsafe_allow_html=True)
+        time_limit = st.slider("⏱️ Time Limit (seconds):", 60, 600, 300, 30, key="slider_p2")
+        
+        if st.button("🚀 Start Part 2", type="primary"):
+            row = draw_from_bank(bank)[0]
+            st.session_state.p2_item = row.id
+            st.session_state.p2_active = True
+            st.session_state.p2_start = time.time()
+            st.session_state.p2_limit = time_limit
+            
+            # GUARDAR EN DISCO (NUEVO)
+            save_state_to_disk("p2", row.id, st.session_state.p2_start, st.session_state.p2_limit)
+            st.rerun()
+
+    # ESTADO EXAMEN (Viendo preguntas)
+    else:
+        # Si llegamos aquí sin ítem (o ya no está en el banco), algo grave pasó.
+        row = current_item(bank, "p2_item")
+        if row is None:
+            st.error("Datos perdidos. Por favor reinicia la Parte 2.")
+            if st.button("Reiniciar"):
+                st.session_state.p2_active = False
+                st.rerun()
+            return
+
+        respuestas = row.answers
+        
+        # Timer
+        live_timer("p2_start", "p2_limit")
+
+        # Text
+        st.subheader(f"Topic: {row.title}")
+        if row.url: st.link_button("📖 Source", row.url)
+
+        problems = template_for(row).problems
+        if problems: st.warning("⚠️ This text has formatting issues: " + "; ".join(problems))
+        with span("render"):
+            texto_visual = render_item(row, "blank")
+        st.markdown(f"<div class='text-box'>{texto_visual}</div>", unsafe_allow_html=True)
+        
+        st.divider()
+
+        # Inputs
+        with span("form"), st.form("form_p2"):
+            cols = st.columns(4)
+            user_ans = []
+            for i in range(len(respuestas)):
+                with cols[i % 4]:
+                    user_ans.append(st.text_input(f"Gap {i+1}", key=f"p2_q{i}"))
+            submitted = st.form_submit_button("Submit Answers", type="primary")
+
+        if submitted:
+            final_time = time.time() - st.session_state.p2_start
+            
+            if final_time > st.session_state.p2_limit: st.error("⏰ TIME OUT!")
+            else: st.success("✅ Submitted!")
+
+            st.write("### 📊 Results")
+            with span("grading"):
+                grade = grade_item(row, user_ans)
+                aciertos = list(grade.correct)
+                score = grade.score
+            # Se muestra y se registra lo que escribió el alumno; la forma normalizada solo sirve para comparar
+            for i, (u, c, ok) in enumerate(zip(user_ans, grade.expected, aciertos)):
+                if ok:
+                    st.write(f"Gap {i+1}: ✅ **{c.upper()}**")
+                else:
+                    st.write(f"Gap {i+1}: ❌ You wrote *{u}* | Correct: **{c.upper()}**")
+
+            st.metric("Score", f"{score}/{len(respuestas)}")
+            if first_submission("p2"):  # Las estadísticas y el rating cuentan solo el primer envío
+                log_attempt("p2", row.id, user_ans, aciertos, final_time, st.session_state.p2_limit,
+                            grade.given)
+            record_mock_score("p2", score, len(respuestas))
+
+             # Full Text
+            st.markdown("---")
+            st.info("📖 **Full Corrected Text:**")
+            with span("render"):
+                full_text = render_item(row, "corrected")
+            st.markdown(f"<div class='text-box'>{full_text}</div>", unsafe_allow_html=True)
+
+        # En el simulacro el texto es el del paquete: no se puede cambiar
+        if not st.session_state.get("mock_active") and st.button("🔄 Try Another Text"):
+            if len(bank) > 1:
+                # La baraja garantiza que no se repite ningún texto hasta agotar el banco
+                nuevo_row = draw_from_bank(bank)[0]
+                
+                st.session_state.p2_item = nuevo_row.id
+                st.session_state.p2_start = time.time()
+                save_state_to_disk("p2", nuevo_row.id, st.session_state.p2_start, st.session_state.p2_limit)
+                st.rerun()
+            else:
+                st.warning("Solo hay 1 ejercicio en la base de datos.")
+
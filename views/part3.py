@@ -0,0 +1,174 @@
+"""Part 3: Word Formation (sesiones al azar o temáticas)."""
+import time
+
+import streamlit as st
+
+from grading import grade_item
+from item_bank import find_item
+from metrics import span
+from word_families import NEGATIVE, get_family_index, themed_items
+
+from views.common import (clear_state_from_disk, draw_from_bank, live_timer, load_data, load_state_from_disk,
+                          log_attempt, record_mock_score, save_state_to_disk)
+
+
+P3_THEMES = {"🎲 Random mix": None, "👪 Word family": "root", "🧩 Affix": "affix", "🏷️ Word class": "class"}
+NEGATIVE_LABEL = "negative prefixes (un-, dis-, im-…) and -less"
+
+def save_p3_progress():
+    """Part 3 guarda los ids de las preguntas, la posición, el marcador y las respuestas dadas"""
+    ss = st.session_state
+    save_state_to_disk("p3", ss.p3_items, ss.p3_q_start, ss.p3_limit, index=ss.p3_index, score=ss.p3_score,
+                       answers=ss.p3_answers, feedback=ss.get("p3_feedback"))
+
+def advance_p3():
+    """Pasa a la siguiente pregunta (o cierra la sesión) tras leer el feedback"""
+    st.session_state.p3_feedback = None
+    if st.session_state.p3_index < st.session_state.p3_total - 1:
+        st.session_state.p3_index += 1
+        # En el simulacro el reloj es el global del examen: no se reinicia por pregunta
+        if not st.session_state.get("mock_active"):
+            st.session_state.p3_q_start = time.time()
+        save_p3_progress()
+    else:
+        st.session_state.p3_active = False # End session
+        st.session_state.p3_finished = True
+        clear_state_from_disk("p3")
+        record_mock_score("p3", st.session_state.p3_score, st.session_state.p3_total)
+
+def run():
+    st.header("📝 Part 3: Word Formation")
+    bank = load_data("p3")
+    
+    if bank is None or len(bank) == 0:
+        st.error("⚠️ Error: Could not find 'fce_data.csv'.")
+        return
+
+    # --- RECUPERACIÓN DE EMERGENCIA ---
+    if 'p3_active' not in st.session_state:
+        recovered = load_state_from_disk("p3")
+        if recovered:
+            st.session_state.p3_items = recovered["ids"]
+            st.session_state.p3_answers = recovered.get("answers", [])
+            st.session_state.p3_total = len(st.session_state.p3_items)
+            st.session_state.p3_limit = recovered["limit"]
+            st.session_state.p3_index = recovered["index"]
+            st.session_state.p3_score = recovered["score"]
+            st.session_state.p3_q_start = recovered["start"]
+            st.session_state.p3_feedback = recovered.get("feedback")
+            st.session_state.p3_active = True
+            st.toast("Sesión restaurada", icon="🔄")
+
+    # Initialize
+    if 'p3_active' not in st.session_state:
+        st.session_state.p3_active = False
+
+    if not st.session_state.p3_active:
+        st.markdown("<div class='instruction-box'><b>Instructions:</b> Use the word given in capitals at the end of some of the lines to form a word that fits in the gap in the same line.</div>", unsafe_allow_html=True)
+        
+        # Sesiones temáticas: una familia de palabras, un afijo o una categoría (índice invertido)
+        theme_kind = P3_THEMES[st.radio("Practice:", list(P3_THEMES), horizontal=True, key="p3_theme")]
+        theme, available = None, len(bank)
+        if theme_kind:
+            values = get_family_index(bank).values(theme_kind)
+            labels = {f"{NEGATIVE_LABEL if v == NEGATIVE else v.upper() if theme_kind == 'root' else v} ({n})": (v, n)
+                      for v, n in values}
+            theme, available = labels[st.selectbox("Theme:", list(labels), key=f"p3_theme_{theme_kind}")]
+
+        col1, col2 = st.columns(2)
+        with col1:
+            num_q = st.number_input("Questions:", 1, available, min(5, available))
+        with col2:
+            time_limit = st.slider("Time per question (s):", 5, 60, 20, key="slider_p3")
+
+        if st.button("🚀 Start Part 3", type="primary"):
+            if theme_kind:
+                items = themed_items(bank, theme_kind, theme, num_q)
+            else:
+                items = draw_from_bank(bank, num_q)
+            st.session_state.p3_items = [item.id for item in items]
+            st.session_state.p3_answers = []
+            st.session_state.p3_total = len(items)
+            st.session_state.p3_limit = time_limit
+            st.session_state.p3_index = 0
+            st.session_state.p3_score = 0
+            st.session_state.p3_feedback = None
+            st.session_state.p3_active = True
+            st.session_state.p3_q_start = time.time()
+            save_p3_progress()
+            st.rerun()
+
+    else:
+        # Progress
+        idx = st.session_state.p3_index
+        # Si aun así se pierden las preguntas (p.ej. sesión caducada o ítem retirado), se reinicia.
+        row = find_item(bank, st.session_state.p3_items[idx]) if 'p3_items' in st.session_state else None
+        if row is None:
+             st.warning("Session reset due to refresh.")
+             st.session_state.p3_active = False
+             st.rerun()
+        
+        st.progress(idx / st.session_state.p3_total, text=f"Question {idx+1}/{st.session_state.p3_total}")
+
+        feedback = st.session_state.get("p3_feedback")
+
+        # Timer (parado mientras se lee el feedback)
+        if not feedback:
+            live_timer("p3_q_start", "p3_limit", style="caption")
+
+        # Question Display
+        c1, c2 = st.columns([1, 4])
+        with c1: st.markdown(f"<div class='root-word'>{row.root}</div>", unsafe_allow_html=True)
+        with c2: st.markdown(f"<div class='text-box'>{row.text}</div>", unsafe_allow_html=True)
+
+        if not feedback:
+            with span("form"), st.form(f"p3_form_{idx}"):
+                ans = st.text_input("Answer:", autocomplete="off")
+                submitted = st.form_submit_button("Check")
+
+            if submitted:
+                final_time = time.time() - st.session_state.p3_q_start
+                with span("grading"):
+                    grade = grade_item(row, [ans])
+                    user_ans = ans  # Tal como lo escribió: lo normalizado solo se usa para comparar
+
+                    if final_time > st.session_state.p3_limit: result = "timeout"
+                    elif grade.correct[0]: result = "correct"
+                    else: result = "wrong"
+                    if result == "correct": st.session_state.p3_score += 1
+
+                # Guardamos solo el resultado: el feedback se pinta en el siguiente rerun
+                # a partir del ítem compartido, sin bloquear el hilo
+                st.session_state.p3_answers.append(user_ans)
+                st.session_state.p3_feedback = {"result": result}
+                log_attempt("p3", row.id, [user_ans], [result == "correct"], final_time, st.session_state.p3_limit,
+                            grade.given)
+                save_p3_progress()
+                st.rerun()
+        else:
+            correct_ans = " / ".join(row.accepted(0)).upper()
+            if feedback["result"] == "timeout":
+                 st.error(f"⏰ TIME OUT! Answer: {correct_ans}")
+            elif feedback["result"] == "correct":
+                 st.success("✅ CORRECT!")
+            else:
+                 st.error(f"❌ WRONG. Answer: {correct_ans}")
+
+            reconstructed = row.text.replace("______", f"<span class='gap-correct'>{row.accepted(0)[0].upper()}</span>")
+            st.markdown(f"<div class='result-box'>📖 <b>Full Sentence:</b><br>{reconstructed}</div>", unsafe_allow_html=True)
+
+            last = idx >= st.session_state.p3_total - 1
+            if st.button("🏁 See Results" if last else "➡️ Next Question", type="primary", key=f"p3_next_{idx}"):
+                advance_p3()
+                st.rerun()
+
+    # Final Screen for Part 3
+    if 'p3_finished' in st.session_state and st.session_state.p3_finished:
+        st.balloons()
+        s = st.session_state.p3_score
+        t = st.session_state.p3_total
+        st.metric("Final Score", f"{s}/{t}", f"{(s/t)*100:.1f}%")
+        if not st.session_state.get("mock_active") and st.button("Start New Session"):
+            del st.session_state.p3_finished
+            st.rerun()
+
@@ -0,0 +1,93 @@
+"""Búsqueda de ejercicios (?view=search&part=p2&q=...)."""
+import time
+from urllib.parse import urlencode, urlsplit
+
+import streamlit as st
+
+from metrics import span
+from search import get_search_index
+
+from views.common import load_data, save_state_to_disk
+
+
+SEARCH_PARTS = {"p1": "Part 1: Multiple Choice", "p2": "Part 2: Open Cloze", "p3": "Part 3: Word Formation"}
+PART_VIEWS = {"p1": "part1", "p2": "part2", "p3": "part3"}
+DEFAULT_LIMITS = {"p1": 300, "p2": 300, "p3": 20}
+
+def start_item(part, item):
+    """Arranca el ejercicio elegido en la búsqueda y salta a su parte"""
+    from views.part3 import save_p3_progress
+    ss = st.session_state
+    now = time.time()
+    if part == "p3":
+        ss.p3_items, ss.p3_answers, ss.p3_total = [item.id], [], 1
+        ss.p3_limit, ss.p3_index, ss.p3_score = DEFAULT_LIMITS["p3"], 0, 0
+        ss.p3_feedback, ss.p3_active, ss.p3_q_start = None, True, now
+        ss.pop("p3_finished", None)
+        save_p3_progress()
+    else:
+        ss[f"{part}_item"] = item.id
+        ss[f"{part}_active"] = True
+        ss[f"{part}_start"] = now
+        ss[f"{part}_limit"] = DEFAULT_LIMITS[part]
+        save_state_to_disk(part, item.id, now, DEFAULT_LIMITS[part])
+    st.query_params["view"] = PART_VIEWS[part]
+    st.rerun()
+
+def share_link(part, query, tags):
+    """Enlace para compartir la búsqueda: vista, parte y consulta (con las etiquetas como #tag).
+
+    Nunca lleva el ?sid= de la barra de direcciones: quien lo abra tendría la sesión de quien lo copió.
+    """
+    q = " ".join([query.strip(), *(f"#{t}" for t in tags if f"#{t}" not in query.split())]).strip()
+    base = urlsplit(st.context.url or "")._replace(query="", fragment="").geturl()
+    return f"{base}?{urlencode({'view': 'search', 'part': part, 'q': q})}"
+
+def run():
+    st.header("🔎 Search Exercises")
+    st.markdown("<div class='instruction-box'><b>Search:</b> words match titles, texts and answers. "
+                "<code>'of'</code> or <code>answer:of</code> only matches gaps whose answer is <i>of</i>; "
+                "<code>#phrasal-verbs</code> filters by tag. All terms must match.</div>", unsafe_allow_html=True)
+
+    # El estado de los widgets se inicializa desde la URL: la búsqueda se puede enlazar
+    if 'search_part' not in st.session_state:
+        st.session_state.search_part = st.query_params.get("part") if st.query_params.get("part") in SEARCH_PARTS else "p1"
+    if 'search_q' not in st.session_state:
+        st.session_state.search_q = st.query_params.get("q", "")
+
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        part = st.selectbox("Part:", list(SEARCH_PARTS), format_func=SEARCH_PARTS.get, key="search_part")
+    with col2:
+        query = st.text_input("Query:", key="search_q", placeholder="'of'  #prepositions  holiday")
+    st.query_params["part"] = part
+    st.query_params["q"] = query
+
+    bank = load_data(part)
+    if bank is None or len(bank) == 0:
+        st.error("⚠️ Error: Could not load this part.")
+        return
+    with span("search"):
+        index = get_search_index(bank)
+        counts = dict(index.tag_counts())
+        tags = st.multiselect("Tags:", list(counts), format_func=lambda t: f"{t} ({counts[t]})", key=f"search_tags_{part}")
+        total, items = index.search(query, tags)
+
+    if not query.strip() and not tags:
+        st.info("Type a query or pick some tags.")
+        return
+    st.caption(f"{total} result(s)" + (f", showing the first {len(items)}" if total > len(items) else ""))
+    st.caption("🔗 Share this search with this link (the address bar also holds your session):")
+    st.code(share_link(part, query, tags), language=None)
+    for item in items:
+        with st.container(border=True):
+            col_t, col_b = st.columns([5, 1])
+            with col_t:
+                st.markdown(f"**{item.title}**" + (f" — {item.text}" if part == "p3" else ""))
+                if part != "p3":
+                    st.caption(item.text[:220] + ("…" if len(item.text) > 220 else ""))
+                st.caption("Answers: " + ", ".join(item.answers))
+            with col_b:
+                if st.button("▶️ Start", key=f"search_start_{item.id}"):
+                    start_item(part, item)
+
@@ -0,0 +1,89 @@
+"""Estilos de la app, construidos una sola vez por proceso.
+
+Streamlit vuelve a ejecutar app.py en cada interacción, pero este módulo se
+importa una sola vez: la hoja de estilos (sin comentarios ni espacios
+sobrantes) y el HTML estático se preparan al importarlo y en cada rerun solo
+se vuelven a emitir, en un único bloque.
+"""
+import re
+
+CSS = """
+/* Estilo para las instrucciones azules */
+.instruction-box { 
+    background-color: #e3f2fd; 
+    padding: 15px; 
+    border-radius: 8px; 
+    border-left: 5px solid #2196F3; 
+    margin-bottom: 20px;
+    color: #0d47a1;
+}
+/* Caja del texto principal */
+.text-box { 
+    background-color: #ffffff; 
+    padding: 25px; 
+    border-radius: 10px; 
+    border: 1px solid #e0e0e0; 
+    font-family: 'Georgia', serif; 
+    font-size: 19px; 
+    line-height: 1.8; 
+    box-shadow: 0 4px 6px rgba(0,0,0,0.05); 
+}
+/* Estilos para los huecos */
+.gap-highlight { background-color: #e3f2fd; padding: 2px 6px; border-radius: 4px; border: 1px solid #90caf9; font-weight: bold; color: #1565c0; }
+.gap-correct { background-color: #e8f5e9; padding: 2px 6px; border-radius: 4px; border: 1px solid #66bb6a; font-weight: bold; color: #2e7d32; }
+
+/* Estilo para la palabra raíz en Part 3 */
+.root-word { 
+    font-size: 24px; 
+    color: #c2185b; 
+    font-weight: 800; 
+    text-align: center; 
+    border: 2px solid #f8bbd0; 
+    padding: 10px; 
+    border-radius: 8px; 
+    background-color: #fce4ec; 
+}
+/* Feedback Box */
+.result-box { background-color: #f1f8e9; padding: 15px; border-radius: 8px; border-left: 6px solid #4CAF50; margin-top: 15px; }
+.full-sentence { font-size: 18px; color: #2e7d32; font-style: italic; }
+/* Tarjeta de créditos (sidebar) */
+.dev-card {
+    background-color: #1e1e1e;
+    color: #00ff41; 
+    padding: 15px;
+    border-radius: 10px;
+    border: 1px solid #00ff41;
+    text-align: center;
+    font-family: 'Courier New', monospace; 
+    box-shadow: 0 0 10px rgba(0, 255, 65, 0.2);
+    margin-bottom: 20px;
+}
+.dev-title {
+    font-size: 12px;
+    color: #ffffff;
+    margin-bottom: 5px;
+    text-transform: uppercase;
+    letter-spacing: 2px;
+}
+.dev-name {
+    font-size: 18px;
+    font-weight: bold;
+}
+"""
+
+DEV_CARD_HTML = """
+<div class="dev-card">
+    <div class="dev-title">🚀 Developed by</div>
+    <div class="dev-name">&lt;Henry Palomino/&gt;</div>
+</div>
+"""
+
+
+def minify(text):
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    text = re.sub(r"\s+", " ", text)
+    return re.sub(r"\s*([{};>])\s*", r"\1", text).strip()
+
+
+PAGE_STYLE = f"<style>{minify(CSS)}</style>"
+DEV_CARD = minify(DEV_CARD_HTML)
@@ -0,0 +1,150 @@
+"""Índice de familias de palabras para Part 3 (fce_data.csv).
+
+Cada ítem de Part 3 se analiza una vez (raíz -> palabra derivada) y se apunta
+en cuatro índices invertidos:
+
+    root    raíz en minúsculas                       ("success")
+    answer  palabra(s) derivada(s) aceptada(s)       ("successful")
+    affix   prefijo o sufijo añadido ("un-", "-ly") y "negative" para los negativos
+    class   categoría deducida del sufijo            ("noun", "adjective", "adverb", "verb")
+
+Una sesión temática ("toda la familia de SUCCESS", "prefijos negativos",
+"adverbios en -ly") es una consulta a un dict: O(k) en los k ítems del tema.
+
+Cuando el CSV cambia, el índice no se rehace entero: los ids de ítem son un hash
+del contenido, así que basta con quitar los ids que desaparecieron y analizar
+solo los nuevos.
+"""
+import random
+import threading
+
+KINDS = ("root", "answer", "affix", "class")
+NEGATIVE = "negative"
+
+NEGATIVE_PREFIXES = ("un", "in", "im", "il", "ir", "dis", "non", "mis")
+PREFIXES = NEGATIVE_PREFIXES + ("over", "under", "re", "pre", "en", "out")
+
+# Sufijo -> categoría (se prueba primero el más largo)
+SUFFIX_CLASS = {
+    "ly": "adverb", "wards": "adverb",
+    "ness": "noun", "ment": "noun", "tion": "noun", "sion": "noun", "ity": "noun", "ance": "noun",
+    "ence": "noun", "ship": "noun", "hood": "noun", "dom": "noun", "ism": "noun", "ist": "noun",
+    "er": "noun", "or": "noun", "ure": "noun", "age": "noun", "th": "noun", "ee": "noun",
+    "ful": "adjective", "less": "adjective", "ous": "adjective", "ive": "adjective",
+    "able": "adjective", "ible": "adjective", "al": "adjective", "ic": "adjective",
+    "ant": "adjective", "ent": "adjective", "ish": "adjective", "y": "adjective",
+    "ise": "verb", "ize": "verb", "ify": "verb", "en": "verb", "ate": "verb",
+}
+_SUFFIXES = sorted(SUFFIX_CLASS, key=len, reverse=True)
+
+
+# ==============================================================================
+# 1. ANÁLISIS DE UNA PALABRA DERIVADA
+# ==============================================================================
+def analyze(root, word):
+    """Devuelve (prefijo, sufijo, categoría) de `word` formada a partir de `root`."""
+    root, word = root.lower(), word.lower()
+    prefix = ""
+    for p in sorted(PREFIXES, key=len, reverse=True):
+        rest = word[len(p):]
+        # El resto tiene que seguir pareciéndose a la raíz ("reality" no es re- + ality)
+        if word.startswith(p) and not root.startswith(p) and len(rest) >= 3 and rest[:2] == root[:2]:
+            prefix = p
+            break
+    suffix = ""
+    stems = (word, word[:-1]) if word.endswith("s") and not root.endswith("s") else (word,)  # plurales: employees
+    for stem in stems:
+        suffix = next((s for s in _SUFFIXES
+                       if stem.endswith(s) and not root.endswith(s) and len(stem) - len(s) >= 3), "")
+        if suffix:
+            break
+    return prefix, suffix, SUFFIX_CLASS.get(suffix, "other")
+
+
+def item_keys(item):
+    """Claves (tipo, valor) bajo las que se indexa un ítem de Part 3."""
+    root = item.root or item.title
+    words = [a.lower() for a in item.accepted(0)]
+    prefix, suffix, word_class = analyze(root, words[0])
+    keys = {("root", root.lower()), ("class", word_class)}
+    keys.update(("answer", w) for w in words)
+    if prefix:
+        keys.add(("affix", f"{prefix}-"))
+    if suffix:
+        keys.add(("affix", f"-{suffix}"))
+    if prefix in NEGATIVE_PREFIXES or suffix == "less":
+        keys.add(("affix", NEGATIVE))
+    return keys
+
+
+# ==============================================================================
+# 2. ÍNDICE INVERTIDO
+# ==============================================================================
+class FamilyIndex:
+    def __init__(self):
+        self.version = None
+        self._lock = threading.Lock()
+        # tipo -> valor -> {id: None} (dict como conjunto ordenado: borrar es O(1))
+        self._postings = {kind: {} for kind in KINDS}
+        self._keys = {}  # id -> claves del ítem, para poder quitarlo
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _add(self, item):
+        keys = item_keys(item)
+        self._keys[item.id] = keys
+        for kind, value in keys:
+            self._postings[kind].setdefault(value, {})[item.id] = None
+
+    def _remove(self, item_id):
+        for kind, value in self._keys.pop(item_id):
+            ids = self._postings[kind][value]
+            del ids[item_id]
+            if not ids:
+                del self._postings[kind][value]
+
+    def update(self, bank):
+        """Sincroniza el índice con una versión del banco. Devuelve (añadidos, quitados)."""
+        if bank.version == self.version:
+            return 0, 0
+        current = {item.id: item for item in bank.items}
+        with self._lock:
+            removed = [i for i in self._keys if i not in current]
+            for item_id in removed:
+                self._remove(item_id)
+            added = [item for item_id, item in current.items() if item_id not in self._keys]
+            for item in added:
+                self._add(item)
+            self.version = bank.version
+        return len(added), len(removed)
+
+    def ids(self, kind, value):
+        with self._lock:
+            return list(self._postings[kind].get(value, ()))
+
+    def values(self, kind):
+        """[(valor, nº de ítems)] de un tipo de clave, ordenados por valor."""
+        with self._lock:
+            return sorted((value, len(ids)) for value, ids in self._postings[kind].items())
+
+
+_indexes = {}  # ruta del banco -> FamilyIndex
+_lock = threading.Lock()
+
+
+def get_family_index(bank):
+    """Índice compartido por todo el proceso, al día con la versión de `bank`."""
+    index = _indexes.get(bank.filename)
+    if index is not None and index.version == bank.version:
+        return index
+    with _lock:
+        index = _indexes.setdefault(bank.filename, FamilyIndex())
+        index.update(bank)
+    return index
+
+
+def themed_items(bank, kind, value, n, rng=random):
+    """Hasta n ítems al azar del tema (tipo, valor), sin recorrer el banco."""
+    ids = get_family_index(bank).ids(kind, value)
+    return [bank.get(i) for i in rng.sample(ids, min(n, len(ids)))]